@@ -1,26 +1,276 @@
-from flask import Flask, request, jsonify, render_template
-import joblib
+from flask import Flask, g, request, jsonify, render_template
+import hashlib
+import json
 import os
-from evaluatemodel import evaluate_credit_score
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import assets
+import instrumentation
+from instrumentation import stage
+from evaluatemodel import evaluate_credit_score, evaluate_credit_scores
+from explanation import explain_contributions, explain_top_k, render_waterfall
+from fast_explain import MODES as EXPLAIN_MODES, TOP_K
+from micro_batching import MICRO_BATCHING, MicroBatcher
+from preprocessing import FEATURE_ORDER
 
 app = Flask(__name__)
 
-# Load model
-model_path = os.path.join(os.path.dirname(__file__), "credit_score_model.pkl")
-model = joblib.load(model_path)
+# Models load on first use via the shared asset cache (call assets.preload() to
+# warm them at boot) and are hot-swapped when a new version is published
+
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 1000))
+NDJSON_MIMETYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+# Explanation plots render on one background thread (pyplot is not thread-safe)
+# and are kept per input hash so repeated requests reuse the image.
+PLOT_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+MAX_CACHED_PLOTS = int(os.environ.get("MAX_CACHED_PLOTS", 256))
+PLOT_TIMEOUT_SECONDS = 30
+PLOT_RETRY_AFTER_SECONDS = 5
+plot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plot-render")
+plot_cache = OrderedDict()
+plot_cache_lock = threading.Lock()
+
+# Concurrent /predict requests are scored together when PREDICT_MICRO_BATCHING=1
+# (see micro_batching.py for the window and batch size knobs). Each row carries the
+# snapshot its request validated against (and caches under), so a batch that spans
+# a hot-swap is scored per version.
+def _score_rows(items):
+    results = [None] * len(items)
+    groups = {}
+    for i, (snapshot, _) in enumerate(items):
+        groups.setdefault(snapshot.version, (snapshot, []))[1].append(i)
+    for snapshot, index in groups.values():
+        scored = evaluate_credit_scores([items[i][1] for i in index], snapshot["model"])
+        for i, result in zip(index, scored):
+            results[i] = result
+    return results
+
+predict_batcher = MicroBatcher(_score_rows, name="predict-batcher")
+
+# Per-request latency (labelled with the serving model version) and stage timers for
+# GET /metrics; nothing is registered when INSTRUMENTATION=0
+if instrumentation.INSTRUMENTATION:
+    @app.before_request
+    def _start_request_timer():
+        instrumentation.request_started(request.endpoint)
+
+    @app.after_request
+    def _record_status(response):
+        g.response_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _finish_request_timer(exc):
+        # Runs even when the view raised (after_request may not): those count as 500
+        instrumentation.request_finished(500 if exc is not None else g.get('response_status', 500))
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def _canonical_row(user_input, model):
+    # The pipeline's inputs in column order: numbers as floats, categories as given
+    preprocessor = model.named_steps["preprocessor"]
+    num_features = preprocessor.transformers_[0][2]
+    cat_features = preprocessor.transformers_[1][2]
+    return [float(user_input[col]) for col in num_features] + [user_input[col] for col in cat_features]
+
+def _score(user_input, snapshot):
+    if MICRO_BATCHING:
+        return predict_batcher((snapshot, user_input))
+    return evaluate_credit_score(user_input, snapshot["model"], return_suggestions=True)
+
 @app.route('/predict', methods=['POST'])
 def predict():
-    user_input = request.json  # Expect JSON input
-    score, suggestions = evaluate_credit_score(user_input, model, return_suggestions=True)
+    live = assets.scoring_pipeline()
+    snapshot = live.get()
+    model = snapshot["model"]
+    instrumentation.label_request(snapshot.version)
+    with stage("parse"):
+        # Checked and coerced against the model's compiled schema (input_schema.py)
+        user_input, error = snapshot.derived["input_schema"].validate(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+    monitor = assets.drift_monitor()
+    if monitor is not None:
+        monitor.observe(user_input)
+
+    cache = assets.prediction_cache()
+    if cache is not None:
+        score, suggestions = cache.get_or_compute(
+            "predict", live, snapshot, _canonical_row(user_input, model), lambda: _score(user_input, snapshot)
+        )
+    else:
+        score, suggestions = _score(user_input, snapshot)
     return jsonify({
         'credit_score': score,
         'suggestions': suggestions
     })
 
+def _parse_batch_body():
+    # Returns a list of rows; rows that fail to parse are kept as exceptions
+    if request.mimetype in NDJSON_MIMETYPES:
+        rows = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(e)
+        return rows
+
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict) and isinstance(payload.get('applicants'), list):
+        payload = payload['applicants']
+    if not isinstance(payload, list):
+        return None
+    return payload
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    with stage("parse"):
+        rows = _parse_batch_body()
+    if rows is None:
+        return jsonify({'error': 'Expected a JSON array of applicants or an NDJSON body'}), 400
+    if len(rows) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch too large ({len(rows)} rows, max {MAX_BATCH_SIZE})'}), 413
+
+    snapshot = assets.scoring_pipeline().get()
+    model = snapshot["model"]
+    instrumentation.label_request(snapshot.version)
+    results = [None] * len(rows)
+    with stage("parse"):
+        valid_index, valid_rows, errors = snapshot.derived["input_schema"].validate_many(rows)
+    for i, error in errors.items():
+        results[i] = {'index': i, 'error': error}
+
+    monitor = assets.drift_monitor()
+    if monitor is not None:
+        monitor.observe_many(valid_rows)
+
+    for i, (score, suggestions) in zip(valid_index, evaluate_credit_scores(valid_rows, model)):
+        results[i] = {'index': i, 'credit_score': score, 'suggestions': suggestions}
+
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'errors': len(results) - len(valid_rows)
+    })
+
+def _plot_key(explanation, fmt):
+    payload = json.dumps({
+        'version': explanation['model_version'],
+        'values': [c['value'] for c in explanation['contributions']],
+        'features': [c['feature'] for c in explanation['contributions']],
+        'format': fmt,
+        'mode': explanation.get('mode', 'exact')
+    })
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+def _schedule_plot(explanation, fmt):
+    key = _plot_key(explanation, fmt)
+    with plot_cache_lock:
+        if key in plot_cache:
+            plot_cache.move_to_end(key)
+        else:
+            plot_cache[key] = plot_executor.submit(render_waterfall, explanation, fmt)
+            while len(plot_cache) > MAX_CACHED_PLOTS:
+                plot_cache.popitem(last=False)
+    return key
+
+@app.route('/explain', methods=['POST'])
+def explain():
+    fmt = request.args.get('format')
+    if fmt is not None and fmt not in PLOT_FORMATS:
+        return jsonify({'error': f"Unsupported format '{fmt}' (use png or svg)"}), 400
+    # ?mode=exact|saabas|leaf_table[&top_k=5] returns only the strongest drivers
+    mode = request.args.get('mode')
+    if mode is not None and mode not in EXPLAIN_MODES:
+        return jsonify({'error': f"Unsupported mode '{mode}' (use one of: {', '.join(EXPLAIN_MODES)})"}), 400
+    top_k_error = f'top_k must be an integer between 1 and {len(FEATURE_ORDER)}'
+    try:
+        k = int(request.args.get('top_k', TOP_K))
+    except ValueError:
+        return jsonify({'error': top_k_error}), 400
+    if not 1 <= k <= len(FEATURE_ORDER):
+        return jsonify({'error': top_k_error}), 400
+
+    snapshot = assets.credit_model().get()
+    instrumentation.label_request(snapshot.version)
+    with stage("parse"):
+        user_input, error = snapshot.derived["input_schema"].validate(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+    try:
+        if mode is None:
+            explanation = explain_contributions(user_input, snapshot)
+        else:
+            explanation = explain_top_k(user_input, mode, k, snapshot)
+    except KeyError as e:
+        return jsonify({'error': f'Missing required field: {e.args[0]}'}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid input: {e}'}), 400
+
+    if fmt is not None:
+        key = _schedule_plot(explanation, fmt)
+        explanation['plot_url'] = f'/explain/plot/{key}.{fmt}'
+    return jsonify(explanation)
+
+@app.route('/schema', methods=['GET'])
+def schema():
+    # Fields, types, ranges and accepted values of ?model=predict (default) or explain
+    live = assets.credit_model() if request.args.get('model') == 'explain' else assets.scoring_pipeline()
+    return jsonify(live.get().derived["input_schema"].spec())
+
+@app.route('/cache/metrics', methods=['GET'])
+def cache_metrics():
+    cache = assets.prediction_cache()
+    if cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(cache.metrics(), enabled=True))
+
+@app.route('/drift', methods=['GET'])
+def drift():
+    # PSI / KS of recent inputs against the training data, per feature
+    monitor = assets.drift_monitor()
+    if monitor is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(monitor.report(), enabled=True))
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return app.response_class(instrumentation.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/slow-requests', methods=['GET'])
+def slow_requests():
+    # Stacks sampled from requests slower than SLOW_REQUEST_MS (empty when it is 0)
+    return jsonify({'threshold_ms': instrumentation.SLOW_REQUEST_MS,
+                    'requests': instrumentation.slow_requests()})
+
+@app.route('/explain/plot/<key>.<fmt>', methods=['GET'])
+def explain_plot(key, fmt):
+    with plot_cache_lock:
+        future = plot_cache.get(key)
+    if future is None or fmt not in PLOT_FORMATS:
+        return jsonify({'error': 'Unknown plot; request it via POST /explain?format=png'}), 404
+    try:
+        image = future.result(timeout=PLOT_TIMEOUT_SECONDS)
+    except FuturesTimeoutError:
+        response = jsonify({'error': 'Plot is still rendering; retry shortly'})
+        response.headers['Retry-After'] = str(PLOT_RETRY_AFTER_SECONDS)
+        return response, 503
+    except Exception as e:
+        # Drop the failed render so the next POST /explain?format=... tries again
+        with plot_cache_lock:
+            if plot_cache.get(key) is future:
+                del plot_cache[key]
+        app.logger.exception("Plot render failed for %s", key)
+        return jsonify({'error': f'Plot rendering failed: {e}'}), 500
+    return app.response_class(image, mimetype=PLOT_FORMATS[fmt])
+
 if __name__ == '__main__':
+    assets.preload()
     app.run(debug=True)
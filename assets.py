@@ -0,0 +1,192 @@
+import os
+import threading
+
+# Process-wide, load-on-first-use cache for models and data. main.py, explanation.py,
+# app.py and streamlitfrontend.py all go through here, so each asset is loaded once
+# per process no matter how many modules use it, and importing those modules is cheap.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MODEL_PATH = "credit_model.pkl"
+ENCODER_PATH = "label_encoders.pkl"
+CREDIT_MODEL_NAME = "credit_model"
+
+SCORING_PIPELINE_PATH = os.path.join(BASE_DIR, "credit_score_model.pkl")
+SCORING_PIPELINE_NAME = "credit_score_model"
+
+# Serve forests from model_compression's memory-mapped export when it matches the
+# current model (float32 leaf values, so predictions can move slightly)
+USE_COMPRESSED_MODEL = os.environ.get("USE_COMPRESSED_MODEL", "0") == "1"
+
+BACKGROUND_DATA_PATH = "credit_score_database.csv"
+BACKGROUND_SAMPLE_SIZE = 100
+
+_cache = {}
+_lock = threading.RLock()
+
+
+def cached(key, factory):
+    value = _cache.get(key)
+    if value is None:
+        with _lock:
+            value = _cache.get(key)
+            if value is None:
+                value = factory()
+                _cache[key] = value
+    return value
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+
+
+def _reinit_lock_after_fork():
+    global _lock
+    _lock = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_lock_after_fork)
+
+
+# --- MODELS ---
+
+def _load_credit_model():
+    from model_registry import get_live_model
+
+    live = get_live_model(CREDIT_MODEL_NAME, legacy={"model": MODEL_PATH, "label_encoders": ENCODER_PATH})
+    # One CreditPipeline per version; the other keys are views of it
+    live.add_preparer("pipeline", _prepare_pipeline)
+    # main.py keys (bools -> str) and explanation.py keys (everything -> str)
+    live.add_preparer("feature_encoder", lambda snapshot: snapshot.derived["pipeline"].encoder())
+    live.add_preparer("feature_encoder_str", lambda snapshot: snapshot.derived["pipeline"].encoder(stringify=True))
+    live.add_preparer("forest_engine", lambda snapshot: snapshot.derived["pipeline"].engine)
+    live.add_preparer("input_schema", _prepare_credit_schema)
+    return live
+
+
+def _prepare_credit_schema(snapshot):
+    from input_schema import credit_model_schema
+
+    return credit_model_schema(snapshot.derived["pipeline"])
+
+
+def _prepare_pipeline(snapshot):
+    from credit_pipeline import from_snapshot
+
+    return from_snapshot(snapshot, CREDIT_MODEL_NAME).prepare(_compile_model)
+
+
+def _compile_model(model):
+    # Flattened inference engine for random forests; None means use model.predict
+    from sklearn.ensemble import RandomForestRegressor
+    from forest_engine import compile_forest
+
+    if not isinstance(model, RandomForestRegressor):
+        return None
+    if USE_COMPRESSED_MODEL:
+        from model_compression import load_for
+
+        compressed = load_for(model)
+        if compressed is not None:
+            return compressed
+    return compile_forest(model)
+
+
+def credit_model():
+    # LiveModel for the random forest + label encoders
+    return cached("credit_model", _load_credit_model)
+
+
+def _load_scoring_pipeline():
+    from model_registry import get_live_model
+
+    live = get_live_model(SCORING_PIPELINE_NAME, legacy={"model": SCORING_PIPELINE_PATH})
+    # Request validation / coercion compiled from the fitted preprocessor
+    live.add_preparer("input_schema", _prepare_scoring_schema)
+    return live
+
+
+def _prepare_scoring_schema(snapshot):
+    from input_schema import scoring_pipeline_schema
+
+    return scoring_pipeline_schema(snapshot["model"], SCORING_PIPELINE_NAME)
+
+
+def scoring_pipeline():
+    # LiveModel for the sklearn Pipeline served by app.py /predict
+    return cached("scoring_pipeline", _load_scoring_pipeline)
+
+
+# --- DATA ---
+
+def background_frame():
+    # Raw sampled rows (feature columns only) used as SHAP background data
+    def load():
+        from feature_store import load_frame
+        from preprocessing import FEATURE_ORDER
+
+        return load_frame(columns=FEATURE_ORDER, sample=BACKGROUND_SAMPLE_SIZE, random_state=42,
+                          data_path=BACKGROUND_DATA_PATH)
+
+    return cached("background_frame", load)
+
+
+def background_matrix(snapshot):
+    import pandas as pd
+    from preprocessing import FEATURE_ORDER
+
+    df = background_frame()
+    X = snapshot.derived["feature_encoder"].encode_columns(df)
+    return pd.DataFrame(X, columns=FEATURE_ORDER, index=df.index)
+
+
+def explainer_service():
+    def load():
+        from explainer_service import get_explainer_service
+
+        return get_explainer_service(credit_model(), background_fn=background_matrix)
+
+    return cached("explainer_service", load)
+
+
+def fast_explainer():
+    # Top-k explanations in exact / saabas / leaf_table mode (see fast_explain.py)
+    def load():
+        from fast_explain import get_fast_explainer
+        from preprocessing import FEATURE_ORDER
+
+        return get_fast_explainer(credit_model(), explainer_service, FEATURE_ORDER)
+
+    return cached("fast_explainer", load)
+
+
+def drift_monitor():
+    # Input drift monitor with the database as baseline, or None when DRIFT_MONITOR=0
+    def load():
+        from drift_monitor import DRIFT_MONITORING, from_database
+
+        return from_database() if DRIFT_MONITORING else False
+
+    return cached("drift_monitor", load) or None
+
+
+def prediction_cache():
+    # Shared result cache, or None when PREDICTION_CACHE=0
+    def load():
+        from prediction_cache import CACHE_ENABLED, PredictionCache
+
+        return PredictionCache() if CACHE_ENABLED else False
+
+    return cached("prediction_cache", load) or None
+
+
+def preload(explainer=False):
+    # Warm everything up front (servers that would rather pay at boot than on request 1)
+    credit_model()
+    scoring_pipeline()
+    background_frame()
+    drift_monitor()
+    if explainer:
+        explainer_service()
@@ -0,0 +1,80 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import assets
+from fast_explain import MODES, TOP_K, top_k
+from preprocessing import FEATURE_ORDER
+
+# Cost of each explanation mode and how well the cheap modes agree with exact TreeSHAP.
+#
+#   python -m benchmarks.fast_explain [--rows 500] [--k 5] [--batch-sizes 1 100 1000]
+#
+# Agreement is measured on --rows rows of credit_score_database.csv: overlap of the
+# top-k feature sets, same top-1 feature, and Spearman correlation of the full
+# |contribution| rankings.
+
+
+def _time(fn, min_seconds=0.5):
+    fn()  # warm-up (builds explainers / tables)
+    times = []
+    deadline = time.perf_counter() + min_seconds
+    while len(times) < 3 or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def _ranks(values):
+    # Rank of each feature by |contribution| (0 = strongest), per row
+    return np.argsort(np.argsort(-np.abs(values), axis=1, kind="stable"), axis=1)
+
+
+def agreement(values, exact, k):
+    index, _ = top_k(values, k)
+    exact_index, _ = top_k(exact, k)
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(index, exact_index)])
+    top1 = np.mean(index[:, 0] == exact_index[:, 0])
+    ranks, exact_ranks = _ranks(values), _ranks(exact)
+    n = values.shape[1]
+    spearman = 1 - 6 * ((ranks - exact_ranks) ** 2).sum(axis=1) / (n * (n ** 2 - 1))
+    return overlap, top1, float(spearman.mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explanation modes: cost and agreement with exact SHAP")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--k", type=int, default=TOP_K)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1000])
+    args = parser.parse_args()
+
+    snapshot = assets.credit_model().get()
+    explainer = assets.fast_explainer()
+    df = pd.read_csv(assets.BACKGROUND_DATA_PATH)
+    df = df.sample(n=max(args.rows, max(args.batch_sizes)), replace=True, random_state=0)
+    X = snapshot.derived["feature_encoder"].encode_columns(df)
+
+    print(f"{'mode':<12} " + " ".join(f"{f'batch={b} ms/row':>18}" for b in args.batch_sizes))
+    for mode in MODES:
+        cells = []
+        for batch_size in args.batch_sizes:
+            batch = X[:batch_size]
+            seconds = _time(lambda: explainer.explain(batch, mode, args.k, snapshot))
+            cells.append(f"{seconds / batch_size * 1000:>18.4f}")
+        print(f"{mode:<12} " + " ".join(cells), flush=True)
+
+    sample = X[:args.rows]
+    _, exact = explainer.contributions(pd.DataFrame(sample, columns=FEATURE_ORDER), "exact", snapshot)
+    print(f"\nAgreement with exact TreeSHAP on {args.rows} rows (k={args.k})")
+    print(f"{'mode':<12} {'top-k overlap':>14} {'top-1 match':>12} {'spearman':>9} {'max |diff|':>11}")
+    for mode in MODES:
+        _, values = explainer.contributions(sample, mode, snapshot)
+        overlap, top1, spearman = agreement(values, exact, args.k)
+        print(f"{mode:<12} {overlap:>14.1%} {top1:>12.1%} {spearman:>9.3f} {np.abs(values - exact).max():>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import time
+
+import numpy as np
+
+import assets
+from forest_engine import BATCH_ROWS, compile_forest
+from main import preprocess_dataframe
+
+# Parity + latency: compiled forest vs RandomForestRegressor.predict.
+#
+#   python -m benchmarks.forest_engine [--rows 1 32 1000 10000]
+
+
+def _time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+def check_parity(model, engine, X):
+    # sklearn accumulates trees in completion order when n_jobs > 1; compare against
+    # the deterministic single-threaded order
+    n_jobs = model.n_jobs
+    model.set_params(n_jobs=1)
+    try:
+        expected = model.predict(X)
+    finally:
+        model.set_params(n_jobs=n_jobs)
+    # Both engine paths: vectorized walk and per-tree apply
+    for actual in (engine.predict(X[:BATCH_ROWS - 1]), engine.predict(X)):
+        if not np.array_equal(expected[:len(actual)], actual):
+            diff = np.abs(expected[:len(actual)] - actual).max()
+            raise AssertionError(f"Compiled forest differs from sklearn (max abs diff {diff})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled forest parity and latency benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 8, 32, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    model = assets.credit_model().get()["model"]
+    engine = compile_forest(model)
+    X = preprocess_dataframe(assets.background_frame()).to_numpy()
+
+    rng = np.random.default_rng(0)
+    X_large = X[rng.integers(0, len(X), max(args.rows))] * rng.uniform(0.8, 1.2, (max(args.rows), X.shape[1]))
+    check_parity(model, engine, X_large)
+    print(f"✅ Bit-for-bit parity on {len(X_large)} rows ({engine.n_trees} trees, {engine.n_nodes} nodes)")
+
+    print(f"{'rows':>7} {'sklearn p50':>12} {'engine p50':>11} {'speedup':>8} {'engine p99':>11}")
+    for n_rows in args.rows:
+        batch = X_large[:n_rows]
+        repeat = max(3, args.repeat // max(1, n_rows // 100))
+        sk_p50, _ = _time(lambda: model.predict(batch), repeat)
+        en_p50, en_p99 = _time(lambda: engine.predict(batch), repeat)
+        print(f"{n_rows:>7} {sk_p50 * 1e3:>10.3f}ms {en_p50 * 1e3:>9.3f}ms {sk_p50 / en_p50:>7.1f}x {en_p99 * 1e3:>9.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Cold-start report: `python -X importtime` for each entry module plus wall time to
+# import it and to serve a first prediction, each in a fresh interpreter.
+#
+#   python -m benchmarks.importtime
+#   python -m benchmarks.importtime --save benchmarks/importtime_baseline.json
+#   python -m benchmarks.importtime --compare benchmarks/importtime_baseline.json
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["main", "explanation", "app", "streamlitfrontend"]
+FIRST_PREDICTION = {
+    "main": "import main; main.predict_credit_score(main.sample_users[0])",
+    "app": (
+        "import app, main; c = app.app.test_client(); "
+        "c.post('/explain', json=main.sample_users[0])"
+    )
+}
+
+
+def _run(code, importtime=False):
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=REPO_DIR, capture_output=True, text=True)
+    return time.perf_counter() - start, proc
+
+
+def parse_importtime(stderr):
+    # Lines look like: "import time:       123 |       4567 |   package.module"
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level
+        rows.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module, repeat=3, top=10):
+    walls, report = [], None
+    for _ in range(repeat):
+        wall, proc = _run(f"import {module}", importtime=True)
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1]}
+        walls.append(wall)
+        report = parse_importtime(proc.stderr)
+
+    # Heaviest imports at the first two nesting levels (deeper ones are counted in them)
+    shallow = [r for r in report if not r[0].startswith("    ") and r[0].strip() != module]
+    heaviest = sorted(shallow, key=lambda r: -r[2])
+    result = {
+        "wall_seconds": min(walls),
+        "import_seconds": sum(r[1] for r in report) / 1e6,
+        "modules_imported": len(report),
+        "heaviest": [{"module": name.strip(), "cumulative_ms": cum / 1000} for name, _, cum in heaviest[:top]]
+    }
+    if module in FIRST_PREDICTION:
+        first = [_run(FIRST_PREDICTION[module])[0] for _ in range(repeat)]
+        result["first_prediction_seconds"] = min(first)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time / cold-start benchmark")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="write results to this JSON baseline")
+    parser.add_argument("--compare", help="compare against this JSON baseline")
+    args = parser.parse_args()
+
+    results = {module: measure(module, args.repeat) for module in args.modules}
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    for module, result in results.items():
+        if "error" in result:
+            print(f"⚠️ {module}: {result['error']}")
+            continue
+        line = f"⏱️ {module}: import {result['wall_seconds']:.3f}s wall, {result['modules_imported']} modules"
+        if "first_prediction_seconds" in result:
+            line += f", first prediction {result['first_prediction_seconds']:.3f}s"
+        if module in baseline and "wall_seconds" in baseline[module]:
+            delta = result["wall_seconds"] / baseline[module]["wall_seconds"] - 1
+            line += f" ({delta:+.0%} vs baseline)"
+        print(line)
+        for entry in result["heaviest"][:5]:
+            print(f"    {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"📁 Baseline saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import model_compression
+from model_compression import COMPRESSED_MODEL_DIR
+
+# Load time and memory: pickled forest (+ compile) vs the memory-mapped export.
+# Each loader runs in a fresh interpreter; RssAnon is private memory every worker
+# pays for, RssFile is page cache that forked workers share.
+#
+#   python model_compression.py              # export first
+#   python -m benchmarks.model_compression [--export-dir compressed_model]
+
+LOADERS = {
+    "pickle": """
+import joblib
+from forest_engine import compile_forest
+model = joblib.load({model_path!r})
+engine = compile_forest(model)
+""",
+    "pickle (model only)": """
+import joblib
+engine = joblib.load({model_path!r})
+""",
+    "compressed mmap": """
+import model_compression
+engine = model_compression.load({export_dir!r})
+"""
+}
+
+PROBE = """
+import json, time
+import numpy as np
+
+def memory():
+    fields = {{}}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0]) / 1024
+    return fields
+
+before = memory()
+start = time.perf_counter()
+{loader}
+load_seconds = time.perf_counter() - start
+after_load = memory()
+X = np.random.default_rng(0).random((1000, {n_features})).astype(np.float32) * 10
+engine.predict(X)
+after_predict = memory()
+print(json.dumps({{"load_seconds": load_seconds, "before": before, "after_load": after_load,
+                   "after_predict": after_predict}}))
+"""
+
+
+def run(loader, model_path, export_dir, n_features):
+    code = PROBE.format(loader=LOADERS[loader].format(model_path=model_path, export_dir=export_dir),
+                        n_features=n_features)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load time and RSS: pickle vs compressed export")
+    parser.add_argument("--model-path", default=os.path.abspath("credit_model.pkl"))
+    parser.add_argument("--export-dir", default=os.path.abspath(COMPRESSED_MODEL_DIR))
+    args = parser.parse_args()
+
+    meta = model_compression.load_meta(args.export_dir)
+    print(f"{'loader':<22} {'load ms':>9} {'+RSS MB':>9} {'+anon MB':>9} {'+file MB':>9}  (after 1000-row predict)")
+    for loader in LOADERS:
+        result = run(loader, args.model_path, args.export_dir, meta["n_features"])
+        before, after = result["before"], result["after_predict"]
+        print(f"{loader:<22} {result['load_seconds'] * 1000:>9.1f} "
+              f"{after['VmRSS'] - before['VmRSS']:>9.1f} {after['RssAnon'] - before['RssAnon']:>9.1f} "
+              f"{after['RssFile'] - before['RssFile']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from benchmarks.worker_memory import SAMPLE_APPLICANT
+
+# Load test for /predict: a threaded server per mode, N concurrent clients, and
+# requests/s plus latency percentiles with and without micro-batching.
+#
+#   python -m benchmarks.predict_load [--clients 32] [--seconds 10] [--max-latency-ms 2] [--max-batch 64]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = "import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"
+
+
+def start_server(port, env):
+    proc = subprocess.Popen([sys.executable, "-c", SERVER.format(port=port)], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            post(port)
+            return proc
+        except OSError:
+            time.sleep(0.3)
+    proc.terminate()
+    raise RuntimeError("server did not come up")
+
+
+def post(port, body=json.dumps(SAMPLE_APPLICANT).encode()):
+    req = urllib.request.Request(f"http://127.0.0.1:{port}/predict", data=body,
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def load(port, clients, seconds):
+    latencies = [[] for _ in range(clients)]
+    stop = time.perf_counter() + seconds
+
+    def client(out):
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            post(port)
+            out.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(out,)) for out in latencies]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    all_latencies = np.concatenate([np.asarray(out) for out in latencies]) * 1000
+    return len(all_latencies) / elapsed, np.percentile(all_latencies, 50), np.percentile(all_latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/predict throughput with and without micro-batching")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--max-latency-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    print(f"{args.clients} concurrent clients, {args.seconds:.0f}s per mode")
+    print(f"{'mode':<16} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    baseline = None
+    for mode, batching in (("per request", "0"), ("micro-batched", "1")):
+        env = dict(os.environ, PREDICT_MICRO_BATCHING=batching,
+                   PREDICT_BATCH_MAX_LATENCY_MS=str(args.max_latency_ms), PREDICT_BATCH_MAX_SIZE=str(args.max_batch))
+        proc = start_server(args.port, env)
+        try:
+            throughput, p50, p99 = load(args.port, args.clients, args.seconds)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+        gain = f"  ({throughput / baseline:.1f}x)" if baseline else ""
+        baseline = baseline or throughput
+        print(f"{mode:<16} {throughput:>9.0f} {p50:>9.1f} {p99:>9.1f}{gain}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+import creditcalculator
+import datageneration
+from rule_engine import score_batch
+
+# Parity against both scalar calculate_credit_score implementations + throughput.
+#
+#   python -m benchmarks.rule_engine [--rows 100000]
+
+BILL_LABELS = ["Always", "Usually", "Sometimes", "Rarely", "Never", "Unknown"]
+EDUCATION_LEVELS = ["12th", "Diploma", "Graduate", "Postgraduate", "PostGraduate", "PhD"]
+
+
+def creditcalculator_records(n, seed=0):
+    # Same shape as datageneration users, with the string labels creditcalculator expects
+    random.seed(seed)
+    records = []
+    for _ in range(n):
+        user = datageneration.generate_synthetic_user()
+        user["bill_payment_consistency"] = random.choice(BILL_LABELS)
+        user["education_level"] = random.choice(EDUCATION_LEVELS)
+        records.append(user)
+    return records
+
+
+def datageneration_records(n, seed=0):
+    random.seed(seed)
+    return [datageneration.generate_synthetic_user() for _ in range(n)]
+
+
+VARIANTS = {
+    "creditcalculator": (creditcalculator.calculate_credit_score, creditcalculator_records),
+    "datageneration": (datageneration.calculate_credit_score, datageneration_records)
+}
+
+
+def check_parity(variant, n=20000):
+    scalar, make_records = VARIANTS[variant]
+    records = make_records(n)
+    expected = np.array([scalar(r) for r in records])
+    actual = score_batch(pd.DataFrame(records), variant)
+    mismatches = np.flatnonzero(expected != actual)
+    if len(mismatches):
+        i = mismatches[0]
+        raise AssertionError(f"{variant}: {len(mismatches)} mismatches, e.g. {records[i]} -> {expected[i]} vs {actual[i]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized rule engine parity and throughput")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    for variant, (scalar, make_records) in VARIANTS.items():
+        check_parity(variant)
+        print(f"✅ {variant}: identical to the scalar calculate_credit_score")
+
+        records = make_records(args.rows)
+        columns = pd.DataFrame(records)
+
+        start = time.perf_counter()
+        for record in records:
+            scalar(record)
+        scalar_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        score_batch(columns, variant)
+        batch_seconds = time.perf_counter() - start
+
+        print(f"   scalar {args.rows / scalar_seconds:>12,.0f} rows/s | "
+              f"vectorized {args.rows / batch_seconds:>12,.0f} rows/s | "
+              f"{scalar_seconds / batch_seconds:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+# Results would otherwise be served from the prediction cache after the first call
+os.environ.setdefault("PREDICTION_CACHE", "0")
+
+import numpy as np
+import pandas as pd
+
+# Latency / throughput / memory suite for every scoring entry point.
+#
+# Fixtures are rows resampled from credit_score_database.csv (to the requested
+# dataset size) plus main.sample_users. Each case runs at several batch sizes; the
+# report has p50/p99 latency per call, rows/s and peak traced memory of one call.
+#
+#   python -m benchmarks.suite
+#   python -m benchmarks.suite --filter predict --batch-sizes 1 100
+#   python -m benchmarks.suite --save-baseline
+#   python -m benchmarks.suite --compare
+#
+# Timings only mean something on the machine that recorded them, so no baseline is
+# committed: record one with --save-baseline on the reference host (default path
+# BASELINE_PATH, gitignored) before the first --compare, and refresh it there after
+# intended changes. --compare exits with status 1 when any case's p50 is more than
+# REGRESSION_THRESHOLD slower than the baseline, and with status 2 when there is no
+# baseline or it was recorded on another host.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(REPO_DIR, "credit_score_database.csv")
+BASELINE_PATH = os.path.join(REPO_DIR, "benchmarks", "suite_baseline.json")
+BATCH_SIZES = [1, 100, 1000]
+DATASET_SIZES = [1000, 10000]
+MIN_SECONDS = 1.0
+MAX_REPEATS = 200
+REGRESSION_THRESHOLD = 0.10
+# Baseline entry describing the machine that recorded it
+HOST_KEY = "_host"
+
+# credit_score_model.pkl was trained on labels rather than the generator's codes
+BILL_LABELS = {1.0: "Always", 0.7: "Usually", 0.4: "Sometimes", 0.2: "Rarely", 0.0: "Rarely"}
+EDUCATION_LABELS = {"PostGraduate": "Postgraduate", "PhD": "Postgraduate"}
+HOUSING_LABELS = {"Pg": "PG/Hostel"}
+
+
+# --- FIXTURES ---
+
+_frames = {}
+
+
+def database(n_rows):
+    if n_rows not in _frames:
+        df = pd.read_csv(DATA_PATH)
+        df = df[df["credit_score"].notna()]
+        _frames[n_rows] = df.sample(n=n_rows, replace=n_rows > len(df), random_state=42).reset_index(drop=True)
+    return _frames[n_rows]
+
+
+def records(n_rows):
+    return database(n_rows).drop(columns=["expected_credit_score"], errors="ignore").to_dict("records")
+
+
+def pipeline_records(n_rows):
+    # Rows the scoring pipeline accepts (a few ingested rows use other spellings)
+    from evaluatemodel import validate_user_input
+
+    model = _scoring_model()
+    rows = []
+    for row in records(n_rows):
+        row = dict(row)
+        row["bill_payment_consistency"] = BILL_LABELS.get(row["bill_payment_consistency"], "Sometimes")
+        row["education_level"] = EDUCATION_LABELS.get(row["education_level"], row["education_level"])
+        row["housing_type"] = HOUSING_LABELS.get(row["housing_type"], row["housing_type"])
+        row["bnpl_used"] = bool(row["bnpl_used"])
+        if validate_user_input(row, model) is None:
+            rows.append(row)
+    return _cycle(rows, n_rows)
+
+
+def sample_users():
+    import main
+
+    return [{k: v for k, v in user.items() if k != "expected_credit_score"} for user in main.sample_users]
+
+
+def _scoring_model():
+    import assets
+
+    return assets.scoring_pipeline().get()["model"]
+
+
+# --- CASES ---
+# Each case: setup(batch_size, dataset_size) -> zero-argument callable scoring batch_size rows
+
+def _cycle(rows, batch_size):
+    return [rows[i % len(rows)] for i in range(batch_size)]
+
+
+def case_predict_credit_score(batch_size, dataset_size):
+    import main
+
+    users = _cycle(sample_users(), batch_size)
+    return lambda: [main.predict_credit_score(user) for user in users]
+
+
+def case_preprocess_dataframe(batch_size, dataset_size):
+    import main
+
+    df = database(dataset_size).head(batch_size)
+    return lambda: main.preprocess_dataframe(df)
+
+
+def case_explain_plot(batch_size, dataset_size):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import explanation
+
+    users = _cycle(sample_users(), batch_size)
+
+    def run():
+        for user in users:
+            plt.close(explanation.explain_credit_score(user, show_plot=False))
+    return run
+
+
+def case_explain_no_plot(batch_size, dataset_size):
+    import explanation
+
+    users = _cycle(sample_users(), batch_size)
+    return lambda: [explanation.explain_contributions(user) for user in users]
+
+
+def case_evaluate_credit_score(batch_size, dataset_size):
+    from evaluatemodel import evaluate_credit_score
+
+    model = _scoring_model()
+    rows = pipeline_records(dataset_size)[:batch_size]
+    return lambda: [evaluate_credit_score(row, model, return_suggestions=True) for row in rows]
+
+
+def case_evaluate_credit_scores(batch_size, dataset_size):
+    from evaluatemodel import evaluate_credit_scores
+
+    model = _scoring_model()
+    rows = pipeline_records(dataset_size)[:batch_size]
+    return lambda: evaluate_credit_scores(rows, model)
+
+
+def case_calculate_credit_score(batch_size, dataset_size):
+    from creditcalculator import calculate_credit_score
+
+    rows = pipeline_records(dataset_size)[:batch_size]
+    return lambda: [calculate_credit_score(row) for row in rows]
+
+
+def case_rule_engine(batch_size, dataset_size):
+    from rule_engine import score_batch
+
+    columns = pd.DataFrame(pipeline_records(dataset_size)[:batch_size])
+    return lambda: score_batch(columns, "creditcalculator")
+
+
+def case_train_model(batch_size, dataset_size):
+    # train_model without saving/publishing: same preparation and forest fit
+    from sklearn.ensemble import RandomForestRegressor
+    from trainmodel import FEATURE_COLUMNS, TARGET_COLUMN, _fit_forest, _prepare_training_data
+
+    df = database(dataset_size)[FEATURE_COLUMNS + [TARGET_COLUMN]]
+
+    def run():
+        X_train, y_train, _, _ = _prepare_training_data(df)
+        _fit_forest(RandomForestRegressor(n_estimators=100, random_state=42), X_train, y_train)
+    return run
+
+
+def case_input_schema(batch_size, dataset_size):
+    # Validation / coercion of raw database rows against the credit_model schema
+    import assets
+
+    schema = assets.credit_model().get().derived["input_schema"]
+    rows = _cycle(records(dataset_size), batch_size)
+    return lambda: schema.validate_many(rows)
+
+
+def case_flask_predict(batch_size, dataset_size):
+    import app
+
+    client = app.app.test_client()
+    rows = _cycle(pipeline_records(dataset_size), batch_size)
+    return lambda: [client.post("/predict", json=row) for row in rows]
+
+
+def case_flask_predict_batch(batch_size, dataset_size):
+    import app
+
+    client = app.app.test_client()
+    rows = _cycle(pipeline_records(dataset_size), batch_size)
+    return lambda: client.post("/predict/batch", json=rows)
+
+
+# name -> (setup, varies with batch size, varies with dataset size). Single-row entry
+# points only run at batch=1: a bigger "batch" would just be a loop over them.
+CASES = {
+    "main.predict_credit_score": (case_predict_credit_score, False, False),
+    "main.preprocess_dataframe": (case_preprocess_dataframe, True, True),
+    "explanation.explain_credit_score (plot)": (case_explain_plot, False, False),
+    "explanation.explain_contributions (no plot)": (case_explain_no_plot, False, False),
+    "evaluatemodel.evaluate_credit_score": (case_evaluate_credit_score, False, False),
+    "evaluatemodel.evaluate_credit_scores": (case_evaluate_credit_scores, True, True),
+    "creditcalculator.calculate_credit_score": (case_calculate_credit_score, False, False),
+    "rule_engine.score_batch": (case_rule_engine, True, True),
+    "trainmodel.train_model (fit only)": (case_train_model, False, True),
+    "input_schema.validate_many": (case_input_schema, True, False),
+    "app /predict": (case_flask_predict, False, False),
+    "app /predict/batch": (case_flask_predict_batch, True, False)
+}
+
+
+# --- RUNNER ---
+
+def measure(fn, rows, min_seconds=MIN_SECONDS, max_repeats=MAX_REPEATS):
+    fn()  # warm-up (lazy loads, caches)
+    times = []
+    deadline = time.perf_counter() + min_seconds
+    while len(times) < max_repeats and (len(times) < 3 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times = np.asarray(times)
+    return {
+        "rows": rows,
+        "repeats": len(times),
+        "p50_ms": float(np.percentile(times, 50) * 1000),
+        "p99_ms": float(np.percentile(times, 99) * 1000),
+        "rows_per_second": float(rows * len(times) / times.sum()),
+        "peak_mb": peak / 2 ** 20
+    }
+
+
+def host_info():
+    return f"{platform.node()} ({os.cpu_count()} CPUs, Python {platform.python_version()})"
+
+
+def run_suite(names, batch_sizes, dataset_sizes, min_seconds):
+    results = {}
+    for name in names:
+        setup, by_batch, by_dataset = CASES[name]
+        for dataset_size in (dataset_sizes if by_dataset else [min(dataset_sizes)]):
+            for batch_size in (batch_sizes if by_batch else [1]):
+                if batch_size > dataset_size:
+                    continue
+                rows = dataset_size if name.startswith("trainmodel") else batch_size
+                key = f"{name} | batch={batch_size} | dataset={dataset_size}"
+                results[key] = measure(setup(batch_size, dataset_size), rows, min_seconds)
+                yield key, results[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring entry point benchmark suite")
+    parser.add_argument("--filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--dataset-sizes", type=int, nargs="+", default=DATASET_SIZES)
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS)
+    parser.add_argument("--save-baseline", "--save", dest="save", nargs="?", const=BASELINE_PATH,
+                        help=f"write results to this JSON baseline (default {BASELINE_PATH})")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH,
+                        help=f"compare against this JSON baseline (default {BASELINE_PATH})")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f"❌ No baseline at {args.compare}. Record one on the reference host first with "
+                  f"python -m benchmarks.suite --save-baseline {args.compare}")
+            sys.exit(2)
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        recorded_on = baseline.pop(HOST_KEY, None)
+        if recorded_on != host_info():
+            print(f"❌ Baseline {args.compare} was recorded on {recorded_on or 'an unknown host'}, "
+                  f"this is {host_info()}. Re-record it here with --save-baseline.")
+            sys.exit(2)
+
+    names = [name for name in CASES if args.filter in name]
+    results, regressions = {}, []
+    print(f"{'case':<72} {'p50 ms':>9} {'p99 ms':>9} {'rows/s':>11} {'peak MB':>8}")
+    for key, result in run_suite(names, args.batch_sizes, args.dataset_sizes, args.min_seconds):
+        results[key] = result
+        line = (f"{key:<72} {result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+                f"{result['rows_per_second']:>11,.0f} {result['peak_mb']:>8.1f}")
+        if key in baseline:
+            delta = result["p50_ms"] / baseline[key]["p50_ms"] - 1
+            flag = "⚠️" if delta > REGRESSION_THRESHOLD else ""
+            if flag:
+                regressions.append(key)
+            line += f"  {delta:+.0%} {flag}"
+        print(line, flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({HOST_KEY: host_info(), **results}, f, indent=2)
+        print(f"📁 Baseline saved to {args.save}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) more than {REGRESSION_THRESHOLD:.0%} slower than {args.compare}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Per-worker memory of a gunicorn server (Linux, reads /proc/<pid>/smaps_rollup).
+# USS (private clean + dirty) is what each extra worker really costs; PSS splits the
+# shared pages between the processes that map them.
+#
+#   python -m benchmarks.worker_memory --launch [--workers 4] [--no-preload]
+#   python -m benchmarks.worker_memory --pid <gunicorn master pid>
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_APPLICANT = {
+    "cash_inflow": 45000, "avg_bank_balance": 8000, "age": 25, "age_to_employment_ratio": 0.6,
+    "rent_amount": 8000, "num_occupants": 2, "grade_or_cgpa": 7.8, "location_type": "Urban",
+    "income_type": "Salaried", "housing_type": "Rented", "bill_payment_consistency": "Always",
+    "bnpl_used": False, "education_level": "Graduate"
+}
+
+
+def memory(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":"):
+                fields[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "uss": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+        "shared": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0)
+    }
+
+
+def children(pid):
+    pids = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            pids.extend(int(p) for p in f.read().split())
+    return sorted(pids)
+
+
+def warm_up(bind, requests_per_worker, workers):
+    body = json.dumps(SAMPLE_APPLICANT).encode()
+    for _ in range(requests_per_worker * workers):
+        req = urllib.request.Request(f"http://{bind}/predict", data=body,
+                                     headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(req, timeout=30).read()
+
+
+def launch(args):
+    env = dict(os.environ, GUNICORN_BIND=args.bind, GUNICORN_WORKERS=str(args.workers),
+               GUNICORN_PRELOAD="0" if args.no_preload else "1")
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + args.timeout
+    while time.time() < deadline:
+        try:
+            if len(children(proc.pid)) >= args.workers:
+                warm_up(args.bind, args.requests, args.workers)
+                return proc
+        except (OSError, FileNotFoundError):
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"gunicorn did not start {args.workers} workers within {args.timeout}s")
+
+
+def report(master):
+    rows = [("master", master, memory(master))] + [("worker", pid, memory(pid)) for pid in children(master)]
+    print(f"{'process':<8} {'pid':>8} {'RSS MB':>9} {'PSS MB':>9} {'USS MB':>9} {'shared MB':>10}")
+    for role, pid, m in rows:
+        print(f"{role:<8} {pid:>8} {m['rss']:>9.1f} {m['pss']:>9.1f} {m['uss']:>9.1f} {m['shared']:>10.1f}")
+    workers = [m for role, _, m in rows if role == "worker"]
+    if workers:
+        print(f"mean worker USS: {sum(m['uss'] for m in workers) / len(workers):.1f} MB | "
+              f"total PSS: {sum(m['pss'] for _, _, m in rows):.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker unique memory of the gunicorn server")
+    parser.add_argument("--pid", type=int, help="gunicorn master pid of a running server")
+    parser.add_argument("--launch", action="store_true", help="start gunicorn with gunicorn.conf.py")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-preload", action="store_true", help="each worker loads its own models")
+    parser.add_argument("--bind", default="127.0.0.1:8765")
+    parser.add_argument("--requests", type=int, default=20, help="warm-up /predict calls per worker")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    if args.pid:
+        report(args.pid)
+        return
+    if not args.launch:
+        parser.error("pass --pid or --launch")
+    proc = launch(args)
+    try:
+        report(proc.pid)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
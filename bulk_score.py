@@ -0,0 +1,272 @@
+import argparse
+import io
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import assets
+from fast_explain import EXPLAIN_MODE, MODES
+from parallel import ordered_map
+from preprocessing import FEATURE_ORDER
+from rule_engine import loan_decisions
+
+# Streaming bulk scorer for large applicant files (nightly portfolio re-scores):
+#
+#   python bulk_score.py applicants.csv --output scores.csv --jobs -1
+#   python bulk_score.py applicants.parquet --output scores.ndjson --top-k 3 --resume
+#
+# Input (CSV, NDJSON or Parquet) is read CHUNK_ROWS rows at a time and each chunk is
+# encoded and scored in a worker process with the current credit_model version; at
+# most 2 chunks per worker are in flight, so memory stays bounded by the chunk size.
+# Results are appended in input order to a CSV or NDJSON file. After every chunk the
+# output is fsynced and <output>.checkpoint.json records how far it got, so --resume
+# continues after the last complete chunk (a partly written chunk is truncated away).
+CHUNK_ROWS = int(os.environ.get("BULK_SCORE_CHUNK_ROWS", 50000))
+INPUT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "ndjson", ".parquet": "parquet"}
+OUTPUT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "ndjson"}
+
+
+def _detect_format(path, formats, fmt=None):
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in formats:
+        raise ValueError(f"Cannot tell the format of '{path}' (use one of: {', '.join(sorted(formats))})")
+    return formats[ext]
+
+
+# --- INPUT ---
+
+def _read_ndjson(path, chunk_rows, start_row):
+    # start_row counts records (non-blank lines), like rows_done
+    with open(path) as f:
+        lines, skipped = [], 0
+        for line in f:
+            if not line.strip():
+                continue
+            if skipped < start_row:
+                skipped += 1
+                continue
+            lines.append(line)
+            if len(lines) == chunk_rows:
+                yield pd.read_json(io.StringIO("".join(lines)), lines=True)
+                lines = []
+        if lines:
+            yield pd.read_json(io.StringIO("".join(lines)), lines=True)
+
+
+def _read_parquet(path, chunk_rows, start_row):
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    skip = start_row
+    for batch in parquet.iter_batches(batch_size=chunk_rows):
+        if skip >= batch.num_rows:
+            skip -= batch.num_rows
+            continue
+        yield batch.slice(skip).to_pandas()
+        skip = 0
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS, fmt=None, start_row=0):
+    # Yields DataFrames of up to chunk_rows rows, skipping the first start_row rows
+    fmt = _detect_format(path, INPUT_FORMATS, fmt)
+    if fmt == "csv":
+        # A callable keeps memory flat (pandas turns a range into a set of row numbers)
+        skiprows = (lambda i: 0 < i <= start_row) if start_row else None
+        yield from pd.read_csv(path, chunksize=chunk_rows, skiprows=skiprows)
+    elif fmt == "ndjson":
+        yield from _read_ndjson(path, chunk_rows, start_row)
+    elif fmt == "parquet":
+        yield from _read_parquet(path, chunk_rows, start_row)
+    else:
+        raise ValueError(f"Unsupported input format '{fmt}'")
+
+
+# --- SCORING (runs in the workers) ---
+
+def _top_drivers(index, values):
+    # Per row: the top_k features by |contribution|, strongest first
+    names = np.asarray(FEATURE_ORDER, dtype=object)[index]
+    columns = {}
+    for k in range(index.shape[1]):
+        columns[f"driver_{k + 1}"] = names[:, k]
+        columns[f"driver_{k + 1}_contribution"] = np.round(values[:, k], 4)
+    return columns
+
+
+def score_chunk(df, top_k=0, snapshot=None, explain_mode=EXPLAIN_MODE):
+    # -> DataFrame with credit_score, loan_decision and optional driver columns
+    snapshot = snapshot or assets.credit_model().get()
+    pipeline = snapshot.derived["pipeline"]
+    X = pipeline.transform(df)
+    scores = np.round(pipeline.predict(X), 2)
+
+    result = {"credit_score": scores, "loan_decision": loan_decisions(scores)}
+    if top_k:
+        _, index, values = assets.fast_explainer().explain(X, explain_mode, top_k, snapshot)
+        result.update(_top_drivers(index, values))
+    return pd.DataFrame(result, index=df.index)
+
+
+def _format_chunk(task):
+    # Workers score and format, the parent only writes bytes
+    first_row, df, id_column, top_k, explain_mode, out_fmt = task
+    result = score_chunk(df, top_k, explain_mode=explain_mode)
+    result.insert(0, "row", np.arange(first_row, first_row + len(df)))
+    if id_column:
+        result.insert(1, id_column, df[id_column].to_numpy())
+    if out_fmt == "ndjson":
+        text = result.to_json(orient="records", lines=True)
+        return len(df), text if text.endswith("\n") else text + "\n"
+    return len(df), result.to_csv(header=False, index=False)
+
+
+def _header(id_column, top_k, out_fmt):
+    if out_fmt != "csv":
+        return ""
+    columns = ["row"] + ([id_column] if id_column else []) + ["credit_score", "loan_decision"]
+    for k in range(1, top_k + 1):
+        columns += [f"driver_{k}", f"driver_{k}_contribution"]
+    return ",".join(columns) + "\n"
+
+
+# --- CHECKPOINTS ---
+
+def checkpoint_path(output):
+    return f"{output}.checkpoint.json"
+
+
+def _write_checkpoint(path, state):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _load_checkpoint(output, state):
+    # The saved state if it belongs to the same job, else None
+    path = checkpoint_path(output)
+    if not os.path.exists(path) or not os.path.exists(output):
+        return None
+    with open(path) as f:
+        saved = json.load(f)
+    for key in ("input", "chunk_rows", "id_column", "top_k", "explain_mode", "output_format"):
+        if saved.get(key) != state[key]:
+            raise ValueError(f"Checkpoint {path} was written with {key}={saved.get(key)!r}, "
+                             f"not {state[key]!r}; rerun without --resume to start over")
+    return saved
+
+
+# --- DRIVER ---
+
+def _check_columns(df, id_column):
+    missing = [col for col in FEATURE_ORDER + ([id_column] if id_column else []) if col not in df.columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {', '.join(missing)}")
+    return df
+
+
+def bulk_score(input_path, output_path, chunk_rows=CHUNK_ROWS, n_jobs=1, top_k=0, id_column=None,
+               input_format=None, output_format=None, resume=False, progress=True, explain_mode=EXPLAIN_MODE):
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if top_k < 0:
+        raise ValueError(f"top_k must be 0 or more (got {top_k})")
+    top_k = min(top_k, len(FEATURE_ORDER))
+    out_fmt = _detect_format(output_path, OUTPUT_FORMATS, output_format)
+    state = {
+        "input": os.path.abspath(input_path),
+        "chunk_rows": chunk_rows,
+        "id_column": id_column,
+        "top_k": top_k,
+        "explain_mode": explain_mode if top_k else None,
+        "output_format": out_fmt,
+        "rows_done": 0,
+        "output_bytes": 0
+    }
+
+    # Load in the parent so forked workers share the model (and explainer) pages
+    live = assets.credit_model()
+    state["model_version"] = live.version
+    if top_k:
+        assets.fast_explainer()
+        if explain_mode == "exact":
+            assets.explainer_service().explainer()
+
+    saved = _load_checkpoint(output_path, state) if resume else None
+    if saved is not None:
+        if saved.get("model_version") != state["model_version"]:
+            print(f"⚠️ Resuming with model {state['model_version']} "
+                  f"(rows before {saved['rows_done']:,} used {saved.get('model_version')})")
+        state.update(rows_done=saved["rows_done"], output_bytes=saved["output_bytes"])
+        print(f"⏩ Resuming after {state['rows_done']:,} rows")
+
+    ckpt = checkpoint_path(output_path)
+    start_row, started = state["rows_done"], time.perf_counter()
+    mode = "r+b" if saved is not None else "wb"
+    with open(output_path, mode) as out:
+        # Drop anything written after the last checkpoint
+        out.truncate(state["output_bytes"])
+        out.seek(state["output_bytes"])
+        if saved is None:
+            out.write(_header(id_column, top_k, out_fmt).encode())
+
+        def tasks():
+            first_row = start_row
+            for df in read_chunks(input_path, chunk_rows, input_format, start_row):
+                yield first_row, _check_columns(df, id_column), id_column, top_k, explain_mode, out_fmt
+                first_row += len(df)
+
+        for n_rows, text in ordered_map(_format_chunk, tasks(), n_jobs):
+            out.write(text.encode())
+            out.flush()
+            os.fsync(out.fileno())
+            state["rows_done"] += n_rows
+            state["output_bytes"] = out.tell()
+            _write_checkpoint(ckpt, state)
+            if progress:
+                elapsed = time.perf_counter() - started
+                done = state["rows_done"] - start_row
+                print(f"⏳ {state['rows_done']:,} rows scored | {done / elapsed:,.0f} rows/s", flush=True)
+
+    elapsed = time.perf_counter() - started
+    state["completed"] = True
+    _write_checkpoint(ckpt, state)
+    return state["rows_done"] - start_row, elapsed
+
+
+def _non_negative_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be a whole number 0 or more (got {value!r})")
+    return number
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV/NDJSON/Parquet applicant file in chunks")
+    parser.add_argument("input")
+    parser.add_argument("--output", required=True, help="CSV or NDJSON file (by extension)")
+    parser.add_argument("--input-format", choices=["csv", "ndjson", "parquet"])
+    parser.add_argument("--output-format", choices=["csv", "ndjson"])
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes (-1 = all cores)")
+    parser.add_argument("--top-k", type=_non_negative_int, default=0, help="also write the k strongest drivers")
+    parser.add_argument("--explain-mode", choices=MODES, default=EXPLAIN_MODE,
+                        help="driver fidelity: exact TreeSHAP or the cheaper Saabas modes")
+    parser.add_argument("--id-column", help="input column copied to the output next to the row number")
+    parser.add_argument("--resume", action="store_true", help="continue from <output>.checkpoint.json")
+    args = parser.parse_args()
+
+    rows, seconds = bulk_score(args.input, args.output, args.chunk_rows, args.jobs, args.top_k, args.id_column,
+                               args.input_format, args.output_format, args.resume, explain_mode=args.explain_mode)
+    print(f"✅ Scored {rows:,} rows in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s) -> {args.output}")
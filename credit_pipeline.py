@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from fast_explain import EXPLAIN_MODE, MODES, TOP_K, LeafTable, saabas_contributions, top_k
+from preprocessing import FEATURE_ORDER, FeatureEncoder
+
+# The credit model as one fitted, versioned artifact: input schema, label encoders and
+# the regressor, published by trainmodel as the registry's single "pipeline" artifact.
+#
+#   pipeline.transform(rows)          dict / list of dicts / DataFrame -> float64 matrix
+#   pipeline.predict(X)               matrix -> scores (compiled forest when available)
+#   pipeline.score(rows)              transform + predict
+#   pipeline.explain(X, mode, k)      top-k drivers (fast_explain modes)
+#
+# Everything derived from the fitted parts (compiled encoders, flattened forest, leaf
+# contribution table, TreeExplainer) is built once per loaded copy and never pickled.
+# main.py, explanation.py, update_model.py and bulk_score.py all use the copy on the
+# current credit_model snapshot (assets.credit_model().get().derived["pipeline"]).
+SCHEMA_VERSION = 1
+TARGET_COLUMN = "credit_score"
+
+
+def build_schema(label_encoders, feature_order=FEATURE_ORDER, target=TARGET_COLUMN):
+    return {
+        "version": SCHEMA_VERSION,
+        "features": list(feature_order),
+        "numeric": [col for col in feature_order if col not in label_encoders],
+        "categorical": {col: [str(c) for c in label_encoders[col].classes_]
+                        for col in feature_order if col in label_encoders},
+        "target": target
+    }
+
+
+class CreditPipeline:
+
+    def __init__(self, model, label_encoders, feature_order=FEATURE_ORDER, target=TARGET_COLUMN,
+                 name="credit_model", metadata=None):
+        self.model = model
+        self.label_encoders = label_encoders
+        self.feature_order = list(feature_order)
+        self.name = name
+        self.metadata = dict(metadata or {})
+        self.schema = build_schema(label_encoders, self.feature_order, target)
+        self._derived = {}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_derived"] = {}
+        return state
+
+    def _get(self, key, factory):
+        value = self._derived.get(key)
+        if value is None and key not in self._derived:
+            value = self._derived[key] = factory()
+        return value
+
+    # --- DERIVED ---
+
+    def prepare(self, compile_fn=None):
+        # Builds the hot-path objects up front; compile_fn(model) -> engine or None
+        # (defaults to forest_engine.compile_forest for random forests)
+        self.encoder()
+        self.encoder(stringify=True)
+        if compile_fn is not None:
+            self._derived["engine"] = compile_fn(self.model)
+        self.engine
+        return self
+
+    def encoder(self, stringify=False):
+        # stringify=False: main.py keys (bools -> str); True: every value through str()
+        return self._get(f"encoder:{stringify}", lambda: FeatureEncoder(
+            self.label_encoders, self.feature_order, stringify=stringify, model=self.name))
+
+    @property
+    def engine(self):
+        def compile_default():
+            from sklearn.ensemble import RandomForestRegressor
+            from forest_engine import compile_forest
+
+            return compile_forest(self.model) if isinstance(self.model, RandomForestRegressor) else None
+
+        return self._get("engine", compile_default)
+
+    def leaf_table(self):
+        return self._get("leaf_table", lambda: LeafTable(self.engine) if self.engine is not None else None)
+
+    def tree_explainer(self):
+        # Path-dependent TreeSHAP explainer (what shap.TreeExplainer(model) gives)
+        import shap
+
+        return self._get("tree_explainer", lambda: shap.TreeExplainer(self.model))
+
+    # --- HOT PATH ---
+
+    def transform(self, rows, stringify=False):
+        # Records (a dict or list of dicts) or a DataFrame
+        encoder = self.encoder(stringify)
+        if isinstance(rows, (dict, list)):
+            return encoder.encode(rows)
+        return encoder.encode_columns(rows)
+
+    def predict(self, X):
+        engine = self.engine
+        if engine is not None:
+            return engine.predict(X)
+        return self.model.predict(pd.DataFrame(np.asarray(X), columns=self.feature_order))
+
+    def score(self, rows, stringify=False):
+        return self.predict(self.transform(rows, stringify))
+
+    def base_value(self):
+        engine = self.engine
+        if engine is None:
+            return float(np.array(self.tree_explainer().expected_value).flatten()[0])
+        return float(np.mean(engine.value[engine.roots]))
+
+    def contributions(self, X, mode=EXPLAIN_MODE):
+        # -> (base value, (n_rows, n_features) contributions)
+        if mode not in MODES:
+            raise ValueError(f"Unknown explanation mode '{mode}' (use one of: {', '.join(MODES)})")
+        if mode == "exact" or self.engine is None:
+            explainer = self.tree_explainer()
+            rows = X if hasattr(X, "columns") else pd.DataFrame(np.asarray(X), columns=self.feature_order)
+            values = np.asarray(explainer.shap_values(rows))
+            return float(np.array(explainer.expected_value).flatten()[0]), values
+        X = np.asarray(X)
+        if mode == "saabas":
+            return self.base_value(), saabas_contributions(self.engine, X)
+        return self.base_value(), self.leaf_table().contributions(X)
+
+    def explain(self, X, mode=EXPLAIN_MODE, k=TOP_K):
+        # -> (base value, feature indices (n_rows, k), contributions (n_rows, k))
+        base_value, contributions = self.contributions(X, mode)
+        index, values = top_k(contributions, k)
+        return base_value, index, values
+
+
+def from_snapshot(snapshot, name="credit_model"):
+    # The version's pipeline artifact, or one assembled from the legacy model +
+    # label_encoders artifacts of versions published before it existed
+    pipeline = snapshot.artifacts.get("pipeline")
+    if pipeline is None:
+        pipeline = CreditPipeline(snapshot["model"], snapshot["label_encoders"], name=name)
+    return pipeline
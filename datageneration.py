@@ -1,6 +1,16 @@
+import argparse
+import os
 import random
+
+import numpy as np
 import pandas as pd
 
+from parallel import ordered_map
+from rule_engine import loan_decisions, score_batch
+
+DATA_PATH = "credit_score_database.csv"
+CHUNK_ROWS = 100000
+
 def generate_synthetic_user():
     return {
         "age": random.randint(21, 60),
@@ -113,16 +123,101 @@ def loan_decision(score):
     else:
         return "Rejected"
 
-def generate_user_database(n=1000):
-    users = []
-    for _ in range(n):
-        user = generate_synthetic_user()
-        user["credit_score"] = calculate_credit_score(user)
-        user["loan_decision"] = loan_decision(user["credit_score"])
-        users.append(user)
-    return pd.DataFrame(users)
+# --- VECTORIZED GENERATION ---
+# Same distributions as generate_synthetic_user, drawn a column at a time from a
+# seeded numpy Generator: randint(a, b) -> integers(a, b + 1), choices(weights) ->
+# choice(p=weights / sum), uniform values rounded as above.
+
+BILL_PAYMENT_VALUES = [1.0, 0.7, 0.4, 0.2, 0.0]
+BILL_PAYMENT_WEIGHTS = [0.4, 0.3, 0.15, 0.1, 0.05]
+
+
+def generate_columns(n, rng):
+    p = np.asarray(BILL_PAYMENT_WEIGHTS) / np.sum(BILL_PAYMENT_WEIGHTS)
+    columns = {
+        "age": rng.integers(21, 61, n),
+        "num_occupants": rng.integers(1, 7, n),
+        "cash_inflow": rng.integers(15000, 100001, n),
+        "avg_bank_balance": rng.integers(500, 30001, n),
+        "bill_payment_consistency": rng.choice(BILL_PAYMENT_VALUES, size=n, p=p),
+        "bnpl_used": rng.choice([True, False], size=n),
+        "bnpl ratio": np.round(rng.uniform(0, 1, n), 2),
+        "rent_amount": rng.integers(5000, 40001, n),
+        "location_type": rng.choice(["Urban", "Semi-Urban", "Rural"], size=n).astype(object),
+        "education_level": rng.choice(["12th", "Diploma", "Graduate", "PostGraduate", "PhD"], size=n).astype(object),
+        "income_type": rng.choice(["Salaried", "Gig", "Informal"], size=n).astype(object),
+        "grade_or_cgpa": np.round(rng.uniform(5.0, 10.0, n), 1),
+        "housing_type": rng.choice(["Owned", "Rented", "Pg"], size=n).astype(object),
+        "age_to_employment_ratio": np.round(rng.uniform(0.2, 0.9, n), 2)
+    }
+    columns["credit_score"] = score_batch(columns, "datageneration")
+    columns["loan_decision"] = loan_decisions(columns["credit_score"]).astype(object)
+    return pd.DataFrame(columns)
+
+
+def _chunk_plan(n, chunk_rows, seed):
+    # One independent child seed per chunk, so the output only depends on
+    # (n, chunk_rows, seed) and not on how many processes generate it
+    sizes = [min(chunk_rows, n - start) for start in range(0, n, chunk_rows)]
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+
+def _generate_chunk(plan):
+    size, seed = plan
+    return generate_columns(size, np.random.default_rng(seed))
+
+
+def _generate_csv_chunk(plan):
+    # CSV formatting costs more than generating the rows, so workers do both
+    index, item = plan
+    return _generate_chunk(item).to_csv(header=index == 0, index=False)
+
+
+def _map_chunks(fn, plan, n_jobs):
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    # At most a few chunks per worker are generated ahead of the writer
+    yield from ordered_map(fn, plan, min(n_jobs, len(plan)))
+
+
+def generate_chunks(n, chunk_rows=CHUNK_ROWS, seed=None, n_jobs=1):
+    # Yields DataFrames of up to chunk_rows rows, in order
+    yield from _map_chunks(_generate_chunk, _chunk_plan(n, chunk_rows, seed), n_jobs)
+
+
+def generate_user_database(n=1000, seed=None):
+    return pd.concat(generate_chunks(n, seed=seed), ignore_index=True)
+
+
+def write_user_database(path=DATA_PATH, n=1000, chunk_rows=CHUNK_ROWS, seed=None, n_jobs=1, fmt="csv"):
+    # Streams chunks to disk; at most a few chunks are in memory at a time.
+    # fmt="csv" writes one CSV, fmt="store" creates a columnar feature store at path.
+    if fmt == "store":
+        from feature_store import FeatureStore
+
+        store = None
+        for chunk in generate_chunks(n, chunk_rows, seed, n_jobs):
+            store = store or FeatureStore.create(path, columns=chunk.columns)
+            store.append_frame(chunk)
+        return n
+
+    plan = list(enumerate(_chunk_plan(n, chunk_rows, seed)))
+    with open(path, "w", newline="") as f:
+        for text in _map_chunks(_generate_csv_chunk, plan, n_jobs):
+            f.write(text)
+    return n
+
 
 # Generate and save dataset
-df = generate_user_database(1000)
-df.to_csv("credit_score_database.csv", index=False)
-print("✅ Dataset saved as credit_score_database.csv")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the synthetic credit score database")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--output", default=DATA_PATH, help="CSV file, or directory with --format store")
+    parser.add_argument("--format", choices=["csv", "store"], default="csv")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes (-1 = all cores)")
+    args = parser.parse_args()
+
+    write_user_database(args.output, args.rows, args.chunk_rows, args.seed, args.jobs, args.format)
+    print(f"✅ Dataset saved as {args.output} ({args.rows} rows)")
@@ -0,0 +1,202 @@
+import math
+import os
+import threading
+from bisect import bisect_right
+
+import numpy as np
+
+# Streaming input-drift monitor against the training data (credit_score_database.csv).
+#
+# Numeric features get fixed bins from the baseline's deciles (midpoints between the
+# values for discrete columns), encoded columns get per-category counts plus an
+# "unseen" bucket for values the label encoders don't know (the ones preprocessing
+# maps to classes_[0]). observe() is one bisect or dict increment per feature; PSI and
+# a binned KS statistic are only computed when report() / drift_check() ask.
+#
+# Rule of thumb for PSI: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 major shift.
+DRIFT_MONITORING = os.environ.get("DRIFT_MONITOR", "1") == "1"
+N_BINS = 10
+PSI_THRESHOLD = float(os.environ.get("DRIFT_PSI_THRESHOLD", 0.25))
+KS_THRESHOLD = float(os.environ.get("DRIFT_KS_THRESHOLD", 0.2))
+MIN_OBSERVATIONS = int(os.environ.get("DRIFT_MIN_OBSERVATIONS", 500))
+UNSEEN = "__unseen__"
+EPSILON = 1e-4
+
+# Spellings used by the /predict pipeline -> the database's values
+ALIASES = {
+    "bill_payment_consistency": {"Always": 1.0, "Usually": 0.7, "Sometimes": 0.4, "Rarely": 0.2, "Never": 0.0},
+    "education_level": {"Postgraduate": "PostGraduate"},
+    "housing_type": {"PG/Hostel": "Pg"}
+}
+
+
+def psi(expected, actual):
+    # Population stability index of two count vectors over the same buckets
+    p = np.maximum(np.asarray(expected, dtype=np.float64) / max(sum(expected), 1), EPSILON)
+    q = np.maximum(np.asarray(actual, dtype=np.float64) / max(sum(actual), 1), EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+class NumericSketch:
+
+    def __init__(self, values, n_bins=N_BINS):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        distinct = np.unique(values)
+        if len(distinct) <= n_bins:
+            edges = (distinct[:-1] + distinct[1:]) / 2
+        else:
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        self.edges = edges.tolist()
+        self.baseline = np.bincount(np.searchsorted(edges, values, side="right"),
+                                    minlength=len(self.edges) + 1).tolist()
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.edges) + 1)
+        self.invalid = 0
+
+    def observe(self, value):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            self.invalid += 1
+            return
+        if math.isnan(value):
+            self.invalid += 1
+        else:
+            self.counts[bisect_right(self.edges, value)] += 1
+
+    def ks(self):
+        # Largest CDF gap at the bin edges (a lower bound on the exact two-sample KS)
+        p = np.cumsum(self.baseline) / max(sum(self.baseline), 1)
+        q = np.cumsum(self.counts) / max(sum(self.counts), 1)
+        return float(np.max(np.abs(p - q)))
+
+    def report(self):
+        n = sum(self.counts)
+        return {"kind": "numeric", "observations": n, "invalid": self.invalid,
+                "psi": psi(self.baseline, self.counts) if n else None, "ks": self.ks() if n else None}
+
+
+class CategoricalSketch:
+
+    def __init__(self, values):
+        self.baseline = {}
+        for value in values:
+            key = str(value)
+            self.baseline[key] = self.baseline.get(key, 0) + 1
+        self.reset()
+
+    def reset(self):
+        self.counts = dict.fromkeys(self.baseline, 0)
+        self.counts[UNSEEN] = 0
+        self.unseen_values = {}
+
+    def observe(self, value):
+        key = str(value)
+        if key in self.baseline:
+            self.counts[key] += 1
+        else:
+            self.counts[UNSEEN] += 1
+            if len(self.unseen_values) < 20 or key in self.unseen_values:
+                self.unseen_values[key] = self.unseen_values.get(key, 0) + 1
+
+    def report(self):
+        keys = list(self.counts)
+        n = sum(self.counts.values())
+        return {"kind": "categorical", "observations": n, "unseen": self.counts[UNSEEN],
+                "unseen_values": dict(self.unseen_values),
+                "psi": psi([self.baseline.get(k, 0) for k in keys], [self.counts[k] for k in keys]) if n else None,
+                "ks": None}
+
+
+class DriftMonitor:
+    # Observations accumulate in a window; drift_check() starts a new one when it
+    # fires, so a shift triggers one retrain rather than one per poll.
+
+    def __init__(self, baseline, numeric_columns, categorical_columns, aliases=ALIASES,
+                 psi_threshold=PSI_THRESHOLD, ks_threshold=KS_THRESHOLD, min_observations=MIN_OBSERVATIONS):
+        self.aliases = aliases
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        # A feature needs at least one observation to have a PSI at all
+        self.min_observations = max(1, min_observations)
+        self._lock = threading.Lock()
+        self.rebaseline(baseline, numeric_columns, categorical_columns)
+
+    def rebaseline(self, baseline, numeric_columns, categorical_columns):
+        # baseline: DataFrame (or dict of columns) holding every monitored column
+        sketches = {col: NumericSketch(baseline[col]) for col in numeric_columns}
+        sketches.update({col: CategoricalSketch(baseline[col]) for col in categorical_columns})
+        with self._lock:
+            self.sketches = sketches
+            self.columns = [(col, sketch, self.aliases[col].get if col in self.aliases else None)
+                            for col, sketch in sketches.items()]
+            self.observations = 0
+
+    def observe(self, row):
+        # One scored input (dict); columns it doesn't have are skipped
+        with self._lock:
+            self.observations += 1
+            for col, sketch, alias in self.columns:
+                if col in row:
+                    value = row[col]
+                    sketch.observe(alias(value, value) if alias is not None else value)
+
+    def observe_many(self, rows):
+        for row in rows:
+            self.observe(row)
+
+    def reset(self):
+        with self._lock:
+            for sketch in self.sketches.values():
+                sketch.reset()
+            self.observations = 0
+
+    def report(self):
+        with self._lock:
+            features = {col: sketch.report() for col, sketch in self.sketches.items()}
+            observations = self.observations
+        # Only features seen in at least min_observations requests can drift
+        drifted = [
+            col for col, f in features.items()
+            if f["observations"] >= self.min_observations
+            and f["psi"] is not None
+            and (f["psi"] > self.psi_threshold or (f["ks"] is not None and f["ks"] > self.ks_threshold))
+        ]
+        return {
+            "observations": observations,
+            "min_observations": self.min_observations,
+            "psi_threshold": self.psi_threshold,
+            "ks_threshold": self.ks_threshold,
+            "drifted": drifted,
+            "features": features
+        }
+
+    def drifted(self):
+        return bool(self.report()["drifted"])
+
+    def drift_check(self):
+        # For ingestion.RetrainPolicy(drift_check=...)
+        report = self.report()
+        if not report["drifted"]:
+            return False
+        print(f"📈 Input drift in {', '.join(report['drifted'])} over {report['observations']} requests")
+        self.reset()
+        return True
+
+
+def from_database(data_path=None, label_encoders=None):
+    # Monitor over FEATURE_ORDER with the database as baseline; the label encoders'
+    # columns are categorical
+    import assets
+    from feature_store import load_frame
+    from preprocessing import FEATURE_ORDER
+
+    if label_encoders is None:
+        label_encoders = assets.credit_model().get()["label_encoders"]
+    df = load_frame(columns=FEATURE_ORDER, data_path=data_path or assets.BACKGROUND_DATA_PATH)
+    categorical = [col for col in FEATURE_ORDER if col in label_encoders]
+    numeric = [col for col in FEATURE_ORDER if col not in label_encoders]
+    return DriftMonitor(df, numeric, categorical)
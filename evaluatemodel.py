@@ -1,57 +1,111 @@
-def evaluate_credit_score(user_input: dict, model, min_score=300, max_score=850, return_suggestions=False):
-    import pandas as pd
-    import numpy as np
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+
+FEATURE_ADVICE = {
+    "cash_inflow": "Your cash inflow is low — increasing your income could improve your score.",
+    "avg_bank_balance": "Maintain a higher average bank balance for better creditworthiness.",
+    "rent_amount": "Reduce your rent burden if possible — high rent affects your score negatively.",
+    "num_occupants": "Consider reducing financial dependency (number of household members).",
+    "grade_or_cgpa": "Improving your academic performance may help in long-term credit evaluation.",
+    "age_to_employment_ratio": "Try to increase your work experience relative to your age.",
+    "income_type_Informal": "Shifting to a more stable income source (like salaried work) could help.",
+    "income_type_Gig": "Gig work is seen as less stable — salaried roles may improve approval chances.",
+    "bill_payment_consistency_Sometimes": "Try to consistently pay your bills on time.",
+    "bill_payment_consistency_Rarely": "Irregular bill payments are a major red flag. Improve this urgently.",
+    "bnpl_used_False": "Using BNPL responsibly can help build credit history.",
+    "housing_type_Rented": "Owning a home can be a positive financial indicator.",
+    "education_level_12th": "Higher education levels are linked with better approval odds.",
+    "education_level_Diploma": "Pursuing higher education may positively impact your score."
+}
 
-    input_df = pd.DataFrame([user_input])
-    prob = model.predict_proba(input_df)[0, 1]
-    credit_score = int(min_score + (max_score - min_score) * prob)
+NO_ISSUES_MESSAGE = "No major issues found — your profile is solid!"
 
-    # Transform input
-    transformed_input = model.named_steps["preprocessor"].transform(input_df)
-    weights = model.named_steps["classifier"].coef_[0]
-    contributions = transformed_input[0] * weights
 
-    # Get feature names
-    preprocessor = model.named_steps["preprocessor"]
+def _feature_names(preprocessor):
     num_features = preprocessor.transformers_[0][2]
     cat_features = preprocessor.transformers_[1][2]
     ohe = preprocessor.named_transformers_["cat"]
     cat_ohe_features = ohe.get_feature_names_out(cat_features)
-    all_feature_names = list(num_features) + list(cat_ohe_features)
-
-    # Contributions
-    import pandas as pd
-    feature_contribs = pd.Series(contributions, index=all_feature_names).sort_values()
-
-    feature_advice = {
-        # ... same advice dict as before ...
-        "cash_inflow": "Your cash inflow is low — increasing your income could improve your score.",
-        "avg_bank_balance": "Maintain a higher average bank balance for better creditworthiness.",
-        "rent_amount": "Reduce your rent burden if possible — high rent affects your score negatively.",
-        "num_occupants": "Consider reducing financial dependency (number of household members).",
-        "grade_or_cgpa": "Improving your academic performance may help in long-term credit evaluation.",
-        "age_to_employment_ratio": "Try to increase your work experience relative to your age.",
-        "income_type_Informal": "Shifting to a more stable income source (like salaried work) could help.",
-        "income_type_Gig": "Gig work is seen as less stable — salaried roles may improve approval chances.",
-        "bill_payment_consistency_Sometimes": "Try to consistently pay your bills on time.",
-        "bill_payment_consistency_Rarely": "Irregular bill payments are a major red flag. Improve this urgently.",
-        "bnpl_used_False": "Using BNPL responsibly can help build credit history.",
-        "housing_type_Rented": "Owning a home can be a positive financial indicator.",
-        "education_level_12th": "Higher education levels are linked with better approval odds.",
-        "education_level_Diploma": "Pursuing higher education may positively impact your score."
-    }
-
-    negative = feature_contribs[feature_contribs < 0]
-    suggestions = []
-
-    for feature in negative.index:
-        for key in feature_advice:
-            if key in feature:
-                suggestions.append(feature_advice[key])
-                break
-
-    if not suggestions:
-        suggestions.append("No major issues found — your profile is solid!")
+    return list(num_features) + list(cat_ohe_features)
+
+
+class SuggestionEngine:
+    # Everything evaluate_credit_score(s) needs from a fitted pipeline, derived once:
+    # output feature names, classifier weights and, aligned with them, the index of
+    # each feature's advice (first FEATURE_ADVICE key contained in the name, -1 for none).
+
+    def __init__(self, model):
+        preprocessor = model.named_steps["preprocessor"]
+        self.preprocessor = preprocessor
+        self.classifier = model.named_steps["classifier"]
+        self.num_features = list(preprocessor.transformers_[0][2])
+        self.cat_features = list(preprocessor.transformers_[1][2])
+        self.categories = [list(c) for c in preprocessor.named_transformers_["cat"].categories_]
+        self.feature_names = np.asarray(_feature_names(preprocessor), dtype=object)
+        self.weights = self.classifier.coef_[0]
+
+        keys = list(FEATURE_ADVICE)
+        self.messages = np.asarray([FEATURE_ADVICE[key] for key in keys], dtype=object)
+        self.advice_index = np.asarray(
+            [next((i for i, key in enumerate(keys) if key in name), -1) for name in self.feature_names],
+            dtype=np.intp
+        )
+
+    def transform(self, input_df):
+        transformed = self.preprocessor.transform(input_df)
+        if hasattr(transformed, "toarray"):
+            transformed = transformed.toarray()
+        return transformed
+
+    def contributions(self, transformed):
+        return transformed * self.weights
+
+    def suggestions(self, contributions):
+        # contributions: (n_rows, n_features) -> one suggestion list per row, features in
+        # ascending contribution order (same as pd.Series.sort_values, hence quicksort)
+        order = np.argsort(contributions, axis=1, kind="quicksort")
+        sorted_contributions = np.take_along_axis(contributions, order, axis=1)
+        advice = self.advice_index[order]
+        mask = (sorted_contributions < 0) & (advice >= 0)
+        return [list(self.messages[row_advice[row_mask]]) or [NO_ISSUES_MESSAGE]
+                for row_advice, row_mask in zip(advice, mask)]
+
+
+_engines = weakref.WeakKeyDictionary()
+_engines_lock = threading.Lock()
+
+
+def suggestion_engine(model):
+    # One engine per loaded pipeline; dropped together with the model
+    engine = _engines.get(model)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(model)
+            if engine is None:
+                engine = SuggestionEngine(model)
+                _engines[model] = engine
+    return engine
+
+
+def evaluate_credit_score(user_input: dict, model, min_score=300, max_score=850, return_suggestions=False):
+    engine = suggestion_engine(model)
+
+    with stage("preprocess"):
+        input_df = pd.DataFrame([user_input])
+        # Transform once; the classifier sees exactly what model.predict_proba would pass it
+        transformed = engine.transform(input_df)
+    with stage("predict"):
+        prob = engine.classifier.predict_proba(transformed)[0, 1]
+        credit_score = int(min_score + (max_score - min_score) * prob)
+
+    with stage("suggestions"):
+        contributions = engine.contributions(transformed)
+        suggestions = engine.suggestions(contributions)[0]
 
     if return_suggestions:
         return credit_score, suggestions
@@ -64,9 +118,54 @@ def evaluate_credit_score(user_input: dict, model, min_score=300, max_score=850,
 
     # Plot (optional)
     import matplotlib.pyplot as plt
+    feature_contribs = pd.Series(contributions[0], index=engine.feature_names).sort_values()
     feature_contribs.plot(kind='barh', figsize=(10, 7), title="Feature Contributions to Credit Score")
     plt.axvline(0, color='black', linestyle='--')
     plt.tight_layout()
     plt.show()
 
     return credit_score
+
+
+# --- BATCH EVALUATION ---
+
+def validate_user_input(user_input, model):
+    # Returns an error message for rows the pipeline would reject, else None
+    if not isinstance(user_input, dict):
+        return "Expected a JSON object"
+
+    engine = suggestion_engine(model)
+
+    missing = [col for col in engine.num_features + engine.cat_features if col not in user_input]
+    if missing:
+        return f"Missing required fields: {', '.join(missing)}"
+
+    for col in engine.num_features:
+        value = user_input[col]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return f"Field '{col}' must be numeric"
+
+    for col, categories in zip(engine.cat_features, engine.categories):
+        if user_input[col] not in categories:
+            allowed = ", ".join(str(c) for c in categories)
+            return f"Field '{col}' has unknown value {user_input[col]!r} (expected one of: {allowed})"
+
+    return None
+
+
+def evaluate_credit_scores(user_inputs, model, min_score=300, max_score=850):
+    # Scores every row with a single transform / predict_proba over the whole matrix.
+    # Rows must already be validated; results are (score, suggestions) in input order.
+    if not user_inputs:
+        return []
+
+    engine = suggestion_engine(model)
+    with stage("preprocess"):
+        transformed = engine.transform(pd.DataFrame(list(user_inputs)))
+    with stage("predict"):
+        probs = engine.classifier.predict_proba(transformed)[:, 1]
+        scores = (min_score + (max_score - min_score) * probs).astype(int)
+
+    with stage("suggestions"):
+        suggestions = engine.suggestions(engine.contributions(transformed))
+    return [(int(score), row) for score, row in zip(scores, suggestions)]
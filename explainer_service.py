@@ -0,0 +1,66 @@
+import os
+import threading
+
+import numpy as np
+
+# "tree_path_dependent" matches shap.TreeExplainer(model) (the original behaviour);
+# "interventional" integrates over a background sample instead.
+FEATURE_PERTURBATION = os.environ.get("SHAP_FEATURE_PERTURBATION", "tree_path_dependent")
+
+
+class ExplainerService:
+    # Builds one shap.TreeExplainer per model version and keeps it on the LiveModel
+    # snapshot, so it is created once (before a new version goes live) and dropped
+    # together with the old version.
+
+    def __init__(self, live_model, feature_perturbation=FEATURE_PERTURBATION, background_fn=None):
+        if feature_perturbation == "interventional" and background_fn is None:
+            raise ValueError("Interventional explanations need a background_fn(snapshot) -> DataFrame")
+        self.live_model = live_model
+        self.feature_perturbation = feature_perturbation
+        self.background_fn = background_fn
+        self.key = f"explainer:{feature_perturbation}"
+        live_model.add_preparer(self.key, self._build)
+
+    def _build(self, snapshot):
+        import shap
+
+        if self.feature_perturbation == "interventional":
+            return shap.TreeExplainer(
+                snapshot["model"],
+                data=self.background_fn(snapshot),
+                feature_perturbation="interventional"
+            )
+        pipeline = snapshot.derived.get("pipeline")
+        if pipeline is not None:
+            # Shared with CreditPipeline.explain(mode="exact")
+            return pipeline.tree_explainer()
+        return shap.TreeExplainer(snapshot["model"])
+
+    def explainer(self, snapshot=None):
+        snapshot = snapshot or self.live_model.get()
+        return snapshot.derived[self.key]
+
+    def base_value(self, snapshot=None):
+        return float(np.array(self.explainer(snapshot).expected_value).flatten()[0])
+
+    def explain(self, rows, snapshot=None):
+        # rows: preprocessed matrix / DataFrame (n_rows x n_features), explained in one call
+        explainer = self.explainer(snapshot)
+        shap_values = np.asarray(explainer.shap_values(rows))
+        return shap_values, float(np.array(explainer.expected_value).flatten()[0])
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_explainer_service(live_model, feature_perturbation=FEATURE_PERTURBATION, background_fn=None):
+    # Shared per (model, perturbation) so main.py and explanation.py reuse one explainer
+    key = (live_model.name, feature_perturbation)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = ExplainerService(live_model, feature_perturbation, background_fn)
+            _services[key] = service
+        return service
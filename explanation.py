@@ -1,51 +1,49 @@
-import shap
-import matplotlib.pyplot as plt
-import pandas as pd
-import joblib
+import io
+import sys
 import numpy as np
+import pandas as pd
+import assets
+from instrumentation import stage
+from preprocessing import FEATURE_ORDER
+
+MODEL_PATH = assets.MODEL_PATH
+ENCODER_PATH = assets.ENCODER_PATH
+BACKGROUND_DATA_PATH = assets.BACKGROUND_DATA_PATH
+REGISTRY_NAME = assets.CREDIT_MODEL_NAME
+
+# Assets (shared with main.py) load on first use and are hot-swapped on new versions
+
+def preprocess_input(user_input, snapshot=None):
+    snapshot = snapshot or assets.credit_model().get()
+    with stage("preprocess"):
+        X = snapshot.derived["pipeline"].transform(user_input, stringify=True)
+        return pd.DataFrame(X, columns=FEATURE_ORDER)
 
-MODEL_PATH = "credit_model.pkl"
-ENCODER_PATH = "label_encoders.pkl"
-BACKGROUND_DATA_PATH = "credit_score_database.csv"
-
-FEATURE_ORDER = [
-    "age",
-    "num_occupants",
-    "cash_inflow",
-    "avg_bank_balance",
-    "bill_payment_consistency",
-    "bnpl_used",
-    "bnpl ratio",
-    "rent_amount",
-    "location_type",
-    "education_level",
-    "income_type",
-    "grade_or_cgpa",
-    "housing_type",
-    "age_to_employment_ratio"
-]
-
-# Load assets
-model = joblib.load(MODEL_PATH)
-label_encoders = joblib.load(ENCODER_PATH)
-background_df = pd.read_csv(BACKGROUND_DATA_PATH)
-
-def preprocess_input(user_input):
-    df = pd.DataFrame([user_input])
-    for col in label_encoders:
-        if col in df.columns:
-            df[col] = df[col].apply(str)
-            known_classes = set(label_encoders[col].classes_)
-            df[col] = df[col].apply(lambda x: x if x in known_classes else label_encoders[col].classes_[0])
-            df[col] = label_encoders[col].transform(df[col])
-    return df[FEATURE_ORDER].astype(float)
+def shap_row(processed, snapshot=None):
+    # -> (SHAP values of the single preprocessed row, base value), cached per vector + version
+    live = assets.credit_model()
+    snapshot = snapshot or live.get()
+    service = assets.explainer_service()
+
+    def compute():
+        with stage("shap"):
+            shap_values, base_value = service.explain(processed, snapshot)
+        return shap_values[0], base_value
+
+    cache = assets.prediction_cache()
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(f"shap:{service.feature_perturbation}", live, snapshot,
+                                processed.iloc[0].to_numpy(), compute)
 
 def explain_credit_score(user_input, show_plot=True):
-    processed = preprocess_input(user_input)
+    import shap
+    import matplotlib.pyplot as plt
 
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(processed)
-    base_value = float(np.array(explainer.expected_value).flatten()[0])
+    snapshot = assets.credit_model().get()
+    processed = preprocess_input(user_input, snapshot)
+
+    row_values, base_value = shap_row(processed, snapshot)
 
     print(f"\n📊 Base Score (average prediction): {round(base_value, 2)}")
 
@@ -53,7 +51,7 @@ def explain_credit_score(user_input, show_plot=True):
     fig, ax = plt.subplots(figsize=(8, 6))
     shap.waterfall_plot(
         shap.Explanation(
-            values=shap_values[0],
+            values=row_values,
             base_values=base_value,
             data=processed.iloc[0],
             feature_names=processed.columns
@@ -63,4 +61,80 @@ def explain_credit_score(user_input, show_plot=True):
 
     if show_plot:
         plt.show()
-    return fig
\ No newline at end of file
+    return fig
+
+# --- RENDER-FREE EXPLANATIONS ---
+
+def explain_contributions(user_input, snapshot=None):
+    # Per-feature SHAP values as plain data; no plotting libraries involved
+    snapshot = snapshot or assets.credit_model().get()
+    processed = preprocess_input(user_input, snapshot)
+    row_values, base_value = shap_row(processed, snapshot)
+
+    contributions = sorted(
+        (
+            {"feature": name, "value": float(value), "shap_value": float(impact)}
+            for name, value, impact in zip(FEATURE_ORDER, processed.iloc[0], row_values)
+        ),
+        key=lambda c: abs(c["shap_value"]),
+        reverse=True
+    )
+    return {
+        "model_version": snapshot.version,
+        "base_value": base_value,
+        "prediction": base_value + float(row_values.sum()),
+        "contributions": contributions
+    }
+
+def explain_top_k(user_input, mode, k, snapshot=None):
+    # explain_contributions limited to the k strongest features, in any fast_explain mode
+    from fast_explain import top_k
+
+    snapshot = snapshot or assets.credit_model().get()
+    processed = preprocess_input(user_input, snapshot)
+    if mode == "exact":
+        row_values, base_value = shap_row(processed, snapshot)
+        row_values = np.asarray(row_values)[None, :]
+    else:
+        with stage(mode):
+            base_value, row_values = assets.fast_explainer().contributions(processed.to_numpy(), mode, snapshot)
+    index, values = top_k(row_values, k)
+    data = processed.iloc[0].to_numpy()
+
+    return {
+        "model_version": snapshot.version,
+        "mode": mode,
+        "base_value": base_value,
+        "prediction": base_value + float(row_values[0].sum()),
+        "contributions": [
+            {"feature": FEATURE_ORDER[i], "value": float(data[i]), "shap_value": float(v)}
+            for i, v in zip(index[0], values[0])
+        ]
+    }
+
+def render_waterfall(explanation, fmt="png", max_display=10):
+    # Renders the output of explain_contributions to PNG/SVG bytes (headless)
+    import matplotlib
+    if "matplotlib.pyplot" not in sys.modules:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import shap
+
+    contributions = explanation["contributions"]
+    fig = plt.figure(figsize=(8, 6))
+    try:
+        shap.plots.waterfall(
+            shap.Explanation(
+                values=np.array([c["shap_value"] for c in contributions]),
+                base_values=explanation["base_value"],
+                data=np.array([c["value"] for c in contributions]),
+                feature_names=[c["feature"] for c in contributions]
+            ),
+            max_display=max_display,
+            show=False
+        )
+        buffer = io.BytesIO()
+        plt.savefig(buffer, format=fmt, bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
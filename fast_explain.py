@@ -0,0 +1,159 @@
+import os
+import threading
+
+import numpy as np
+
+# Top-k explanations at selectable fidelity, for flows that only show a few drivers.
+#
+#   "exact"       TreeSHAP through ExplainerService (what /explain and the plots use)
+#   "saabas"      path contributions collected while walking the compiled forest: at
+#                 every split the change in node mean is credited to the split feature
+#   "leaf_table"  the same Saabas values, precomputed per leaf when a model version
+#                 goes live, so explaining a row is one leaf lookup per tree
+#
+# Saabas ignores feature interactions along the path, so the ranking can differ from
+# SHAP on close calls; contributions still sum to prediction - base value. Compare
+# cost and rank agreement with: python -m benchmarks.fast_explain
+MODES = ("exact", "saabas", "leaf_table")
+EXPLAIN_MODE = os.environ.get("FAST_EXPLAIN_MODE", "leaf_table")
+TOP_K = int(os.environ.get("FAST_EXPLAIN_TOP_K", 5))
+CHUNK_ROWS = 4096
+
+
+def top_k(contributions, k=TOP_K):
+    # -> (feature indices, contributions), each (n_rows, k), strongest |contribution| first
+    k = min(k, contributions.shape[1])
+    magnitude = np.abs(contributions)
+    index = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(magnitude, index, axis=1), axis=1, kind="stable")
+    index = np.take_along_axis(index, order, axis=1)
+    return index, np.take_along_axis(contributions, index, axis=1)
+
+
+# --- SAABAS ---
+
+def saabas_contributions(engine, X):
+    # Walk all trees together (like CompiledForest.apply), crediting each step's change
+    # in node value to the feature split on; -> (n_rows, n_features)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n_rows, n_features = X.shape
+    flat = X.ravel()
+    row_base = (np.arange(n_rows) * n_features)[None, :]
+    node = np.repeat(engine.roots[:, None], n_rows, axis=1)
+    has_nan = engine.missing_left is not None and np.isnan(X).any()
+    totals = np.zeros(n_rows * n_features, dtype=np.float64)
+    for _ in range(engine.max_depth):
+        feature = engine.feature[node]
+        x = flat[row_base + feature]
+        go_left = x <= engine.threshold[node]
+        if has_nan:
+            go_left = np.where(np.isnan(x), engine.missing_left[node], go_left)
+        child = np.where(go_left, engine.left[node], engine.right[node])
+        delta = engine.value[child].astype(np.float64) - engine.value[node]
+        totals += np.bincount((row_base + feature).ravel(), weights=delta.ravel(), minlength=totals.size)
+        node = child
+    return totals.reshape(n_rows, n_features) / engine.n_trees
+
+
+def leaf_contribution_table(engine):
+    # -> (row of each node in the table or -1, (n_leaves, n_features) path contributions).
+    # Filled level by level from the roots, so every parent's row is complete first.
+    n_nodes = engine.n_nodes
+    is_leaf = engine.left == np.arange(n_nodes)
+    paths = np.zeros((n_nodes, engine.n_features), dtype=np.float64)
+    value = engine.value.astype(np.float64)
+    parents = engine.roots[~is_leaf[engine.roots]]
+    while parents.size:
+        features = engine.feature[parents]
+        for children in (engine.left[parents], engine.right[parents]):
+            paths[children] = paths[parents]
+            paths[children, features] += value[children] - value[parents]
+        children = np.concatenate([engine.left[parents], engine.right[parents]])
+        parents = children[~is_leaf[children]]
+
+    leaves = np.flatnonzero(is_leaf)
+    leaf_row = np.full(n_nodes, -1, dtype=np.intp)
+    leaf_row[leaves] = np.arange(len(leaves))
+    return leaf_row, paths[leaves] / engine.n_trees
+
+
+class LeafTable:
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.leaf_row, self.table = leaf_contribution_table(engine)
+
+    def contributions(self, X):
+        X = np.asarray(X)
+        out = np.empty((X.shape[0], self.engine.n_features), dtype=np.float64)
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            rows = self.table[self.leaf_row[self.engine.leaves(X[start:start + CHUNK_ROWS])]]
+            out[start:start + CHUNK_ROWS] = rows.sum(axis=0)
+        return out
+
+
+# --- SERVICE ---
+
+class FastExplainer:
+    # A view of the snapshot's CreditPipeline, which owns the saabas / leaf_table
+    # computation; "exact" goes through ExplainerService so top-k rankings use the
+    # same (possibly interventional) TreeSHAP explainer as /explain and the plots.
+    # The leaf table is built through a LiveModel preparer (before the version goes
+    # live). exact_service_fn() returns the ExplainerService, only created once
+    # "exact" needs it, since building TreeExplainers is slow.
+
+    def __init__(self, live_model, exact_service_fn, feature_names):
+        self.live_model = live_model
+        self.exact_service_fn = exact_service_fn
+        self.feature_names = list(feature_names)
+        self.key = "leaf_table"
+        live_model.add_preparer(self.key, self._build)
+
+    def _build(self, snapshot):
+        return snapshot.derived["pipeline"].leaf_table()
+
+    def base_value(self, snapshot=None):
+        snapshot = snapshot or self.live_model.get()
+        return snapshot.derived["pipeline"].base_value()
+
+    def contributions(self, X, mode=EXPLAIN_MODE, snapshot=None):
+        # -> (base value, (n_rows, n_features) contributions); non-forest models are
+        # always explained exactly (by the pipeline)
+        if mode not in MODES:
+            raise ValueError(f"Unknown explanation mode '{mode}' (use one of: {', '.join(MODES)})")
+        snapshot = snapshot or self.live_model.get()
+        if mode == "exact":
+            import pandas as pd
+
+            rows = X if hasattr(X, "columns") else pd.DataFrame(X, columns=self.feature_names)
+            shap_values, base_value = self.exact_service_fn().explain(rows, snapshot)
+            return base_value, shap_values
+        return snapshot.derived["pipeline"].contributions(X, mode)
+
+    def explain(self, X, mode=EXPLAIN_MODE, k=TOP_K, snapshot=None):
+        # -> (base value, feature indices (n_rows, k), contributions (n_rows, k))
+        base_value, contributions = self.contributions(X, mode, snapshot)
+        index, values = top_k(contributions, k)
+        return base_value, index, values
+
+    def drivers(self, X, mode=EXPLAIN_MODE, k=TOP_K, snapshot=None):
+        # One [{"feature", "contribution"}, ...] list per row
+        _, index, values = self.explain(X, mode, k, snapshot)
+        names = self.feature_names
+        return [
+            [{"feature": names[i], "contribution": float(v)} for i, v in zip(row_index, row_values)]
+            for row_index, row_values in zip(index, values)
+        ]
+
+
+_explainers = {}
+_explainers_lock = threading.Lock()
+
+
+def get_fast_explainer(live_model, exact_service_fn, feature_names):
+    with _explainers_lock:
+        explainer = _explainers.get(live_model.name)
+        if explainer is None:
+            explainer = FastExplainer(live_model, exact_service_fn, feature_names)
+            _explainers[live_model.name] = explainer
+        return explainer
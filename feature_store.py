@@ -0,0 +1,349 @@
+import io
+import json
+import os
+import shutil
+import sys
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+# Layout:
+#   feature_store/manifest.json          segment list + current tail file (replaced atomically)
+#   feature_store/seg-00001/NNN.npy      one memory-mappable array per column
+#   feature_store/seg-00001/meta.json    column -> (file, kind)
+#   feature_store/tail-00002.ndjson      append-only rows not yet sealed into a segment
+#
+# Appends only write to the tail (O(1)); once it holds SEGMENT_ROWS rows it is
+# sealed into a new segment. compact() rewrites all segments into one.
+# Single writer per store (the ingestion worker); any number of readers. Sealing and
+# compacting delete the replaced files right after the new manifest is written, so a
+# reader that finds a file of its manifest gone reloads the manifest and reads again
+# (files it already opened or memory-mapped stay readable until closed).
+STORE_DIR = os.environ.get("FEATURE_STORE_DIR", "feature_store")
+DATA_PATH = "credit_score_database.csv"
+SEGMENT_ROWS = int(os.environ.get("FEATURE_STORE_SEGMENT_ROWS", 50000))
+READ_ATTEMPTS = 5
+
+
+def _atomic_write_json(path, obj):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(obj, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot store value of type {type(value).__name__}")
+
+
+def _complete_lines(path):
+    # The tail's bytes up to the last newline: the writer may be mid-append, and a
+    # half-written last row only becomes visible once its newline is there
+    with open(path, "rb") as f:
+        data = f.read()
+    return data[:data.rfind(b"\n") + 1]
+
+
+# --- COLUMN ENCODING ---
+
+def _encode_column(series):
+    # -> (array, kind). Strings are stored fixed-width with "" for missing, which is
+    # how read_csv treats empty fields anyway.
+    values = series.to_numpy()
+    if series.dtype == bool:
+        return values.astype(bool), "bool"
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return values, "num"
+    present = series.dropna()
+    if len(present) and all(isinstance(v, (bool, np.bool_)) for v in present):
+        # bools with gaps: 1.0 / 0.0 / NaN
+        return series.map(lambda v: np.nan if pd.isna(v) else float(v)).to_numpy(dtype=np.float64), "bool"
+    if all(isinstance(v, (int, float, np.number)) for v in present):
+        # numbers that came through the tail as object (e.g. all-null JSON columns)
+        return pd.to_numeric(series).to_numpy(dtype=np.float64), "num"
+    return series.map(lambda v: "" if pd.isna(v) else str(v)).to_numpy(dtype=str), "str"
+
+
+def _decode_column(array, kind):
+    if kind == "str":
+        values = np.asarray(array, dtype=object)
+        values[values == ""] = np.nan
+        return values
+    if kind == "bool" and array.dtype != bool:
+        if np.isnan(array).any():
+            return np.array([np.nan if np.isnan(v) else bool(v) for v in array], dtype=object)
+        return array.astype(bool)
+    return np.asarray(array)
+
+
+class FeatureStore:
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        self._manifest = self._read_manifest()
+        self._tail_rows = self._count_tail_rows()
+
+    # --- manifest ---
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.store_dir, "manifest.json")
+
+    def _read_manifest(self):
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        _atomic_write_json(self.manifest_path, manifest)
+        self._manifest = manifest
+
+    @property
+    def tail_path(self):
+        return os.path.join(self.store_dir, self._manifest["tail"])
+
+    def _count_tail_rows(self, path=None):
+        path = path or self.tail_path
+        if not os.path.exists(path):
+            return 0
+        return sum(1 for line in _complete_lines(path).split(b"\n") if line.strip())
+
+    def __len__(self):
+        return sum(seg["rows"] for seg in self._manifest["segments"]) + self._tail_rows
+
+    @property
+    def columns(self):
+        return list(self._manifest["columns"])
+
+    # --- create / write ---
+
+    @classmethod
+    def create(cls, store_dir=STORE_DIR, columns=()):
+        os.makedirs(store_dir, exist_ok=True)
+        if os.path.exists(os.path.join(store_dir, "manifest.json")):
+            raise FileExistsError(f"Feature store already exists at {store_dir}")
+        _atomic_write_json(os.path.join(store_dir, "manifest.json"), {
+            "columns": list(columns),
+            "segments": [],
+            "next_id": 2,
+            "tail": "tail-00001.ndjson"
+        })
+        return cls(store_dir)
+
+    def _next_name(self, manifest, prefix, ext=""):
+        name = f"{prefix}-{manifest['next_id']:05d}{ext}"
+        manifest["next_id"] += 1
+        return name
+
+    def _write_segment(self, df, manifest):
+        name = self._next_name(manifest, "seg")
+        staging = os.path.join(self.store_dir, f".staging-{name}")
+        os.makedirs(staging)
+        meta = {}
+        for i, col in enumerate(df.columns):
+            array, kind = _encode_column(df[col])
+            filename = f"{i:03d}.npy"
+            np.save(os.path.join(staging, filename), array, allow_pickle=False)
+            meta[col] = {"file": filename, "kind": kind}
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.rename(staging, os.path.join(self.store_dir, name))
+        return {"name": name, "rows": len(df)}
+
+    def _add_columns(self, manifest, columns):
+        for col in columns:
+            if col not in manifest["columns"]:
+                manifest["columns"].append(col)
+
+    def append(self, rows):
+        # rows: dict or list of dicts; O(len(rows)) regardless of store size
+        if isinstance(rows, dict):
+            rows = [rows]
+        with self._lock:
+            new_columns = [c for row in rows for c in row if c not in self._manifest["columns"]]
+            if new_columns:
+                manifest = dict(self._manifest, columns=list(self._manifest["columns"]))
+                self._add_columns(manifest, new_columns)
+                self._write_manifest(manifest)
+            with open(self.tail_path, "a") as f:
+                for row in rows:
+                    f.write(json.dumps(row, default=_json_default) + "\n")
+            self._tail_rows += len(rows)
+            if self._tail_rows >= SEGMENT_ROWS:
+                self._seal_tail()
+
+    def append_frame(self, df):
+        # Bulk load: written straight to segments, bypassing the tail
+        with self._lock:
+            manifest = json.loads(json.dumps(self._manifest))
+            self._add_columns(manifest, df.columns)
+            for start in range(0, len(df), SEGMENT_ROWS):
+                chunk = df.iloc[start:start + SEGMENT_ROWS]
+                manifest["segments"].append(self._write_segment(chunk, manifest))
+            self._write_manifest(manifest)
+
+    def _read_tail(self, path=None):
+        path = path or self.tail_path
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        data = _complete_lines(path)
+        if not data.strip():
+            return pd.DataFrame()
+        return pd.read_json(io.StringIO(data.decode()), lines=True, dtype=False, convert_dates=False)
+
+    def _seal_tail(self):
+        old_tail = self.tail_path
+        tail_df = self._read_tail(old_tail)
+        manifest = json.loads(json.dumps(self._manifest))
+        if len(tail_df):
+            manifest["segments"].append(self._write_segment(tail_df, manifest))
+        manifest["tail"] = self._next_name(manifest, "tail", ".ndjson")
+        # The new manifest drops the old tail and adds its segment in one step
+        self._write_manifest(manifest)
+        self._tail_rows = 0
+        if os.path.exists(old_tail):
+            os.remove(old_tail)
+
+    def seal(self):
+        with self._lock:
+            self._seal_tail()
+
+    def compact(self):
+        # Rewrites everything (segments + tail) into as few segments as possible
+        with self._lock:
+            df = self._read_all()
+            old_segments = [seg["name"] for seg in self._manifest["segments"]]
+            old_tail = self.tail_path
+            manifest = json.loads(json.dumps(self._manifest))
+            manifest["segments"] = []
+            for start in range(0, len(df), SEGMENT_ROWS):
+                manifest["segments"].append(self._write_segment(df.iloc[start:start + SEGMENT_ROWS], manifest))
+            manifest["tail"] = self._next_name(manifest, "tail", ".ndjson")
+            self._write_manifest(manifest)
+            self._tail_rows = 0
+            for name in old_segments:
+                shutil.rmtree(os.path.join(self.store_dir, name), ignore_errors=True)
+            if os.path.exists(old_tail):
+                os.remove(old_tail)
+
+    # --- read ---
+
+    def _segment_columns(self, seg, columns, rows=None):
+        seg_dir = os.path.join(self.store_dir, seg["name"])
+        with open(os.path.join(seg_dir, "meta.json")) as f:
+            meta = json.load(f)
+        data = {}
+        for col in columns:
+            if col not in meta:
+                # Column added after this segment was written
+                data[col] = np.full(seg["rows"] if rows is None else len(rows), np.nan)
+                continue
+            array = np.load(os.path.join(seg_dir, meta[col]["file"]), mmap_mode="r")
+            if rows is not None:
+                array = array[rows]
+            data[col] = _decode_column(array, meta[col]["kind"])
+        return pd.DataFrame(data, columns=columns)
+
+    def _tail_path_of(self, manifest):
+        # The manifest's tail; FileNotFoundError if it was sealed away since then
+        # (a missing tail is only "no rows yet" while it is still the current one)
+        path = os.path.join(self.store_dir, manifest["tail"])
+        if not os.path.exists(path) and self._read_manifest()["tail"] != manifest["tail"]:
+            raise FileNotFoundError(path)
+        return path
+
+    def _read_all(self, columns=None, manifest=None):
+        manifest = manifest or self._manifest
+        columns = list(columns) if columns is not None else self.columns
+        frames = [self._segment_columns(seg, columns) for seg in manifest["segments"]]
+        tail_df = self._read_tail(self._tail_path_of(manifest))
+        if len(tail_df):
+            frames.append(tail_df.reindex(columns=columns))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def read(self, columns=None, sample=None, random_state=None):
+        # columns: projection (only those .npy files are touched)
+        # sample: number of random rows, gathered from the memory maps without a full read
+        columns = list(columns) if columns is not None else self.columns
+        missing = [c for c in columns if c not in self._manifest["columns"]]
+        if missing:
+            raise KeyError(f"Columns not in feature store: {missing}")
+        for attempt in range(READ_ATTEMPTS):
+            manifest = self._manifest if attempt == 0 else self._read_manifest()
+            try:
+                return self._read(manifest, columns, sample, random_state)
+            except FileNotFoundError:
+                # A seal / compact replaced part of this manifest mid-read
+                if attempt == READ_ATTEMPTS - 1:
+                    raise
+
+    def _read(self, manifest, columns, sample, random_state):
+        tail_path = self._tail_path_of(manifest)
+        n_rows = sum(seg["rows"] for seg in manifest["segments"]) + self._count_tail_rows(tail_path)
+        if sample is None or sample >= n_rows:
+            return self._read_all(columns, manifest)
+
+        rng = np.random.default_rng(random_state)
+        picked = np.sort(rng.choice(n_rows, size=sample, replace=False))
+        frames, offset = [], 0
+        for seg in manifest["segments"]:
+            local = picked[(picked >= offset) & (picked < offset + seg["rows"])] - offset
+            if len(local):
+                frames.append(self._segment_columns(seg, columns, local))
+            offset += seg["rows"]
+        local = picked[picked >= offset] - offset
+        if len(local):
+            frames.append(self._read_tail(self._tail_path_of(manifest)).reindex(columns=columns).iloc[local])
+        return pd.concat(frames, ignore_index=True)
+
+
+# --- HELPERS ---
+
+def exists(store_dir=STORE_DIR):
+    return os.path.exists(os.path.join(store_dir, "manifest.json"))
+
+
+def import_csv(csv_path=DATA_PATH, store_dir=STORE_DIR, chunksize=SEGMENT_ROWS):
+    store = FeatureStore.create(store_dir, columns=pd.read_csv(csv_path, nrows=0).columns)
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        store.append_frame(chunk)
+    return store
+
+
+def load_frame(columns=None, sample=None, random_state=None, store_dir=STORE_DIR, data_path=DATA_PATH):
+    # DataFrame from the feature store when it exists, else from the CSV
+    if exists(store_dir):
+        return FeatureStore(store_dir).read(columns, sample, random_state)
+    df = pd.read_csv(data_path, usecols=columns)
+    if columns is not None:
+        df = df[list(columns)]
+    if sample is not None:
+        df = df.sample(n=min(sample, len(df)), random_state=random_state).reset_index(drop=True)
+    return df
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+    if command == "import":
+        csv_path = sys.argv[2] if len(sys.argv) > 2 else DATA_PATH
+        store = import_csv(csv_path)
+        print(f"✅ Imported {len(store)} rows from {csv_path} into {STORE_DIR}/")
+    elif command == "compact":
+        store = FeatureStore()
+        store.compact()
+        print(f"✅ Compacted {len(store)} rows into {len(store._manifest['segments'])} segment(s)")
+    elif command == "info":
+        store = FeatureStore()
+        print(f"📦 {STORE_DIR}: {len(store)} rows, {len(store._manifest['segments'])} segment(s), "
+              f"{store._tail_rows} rows in tail")
+        print("Columns:", ", ".join(store.columns))
+    else:
+        print("Usage: python feature_store.py [import [csv_path] | compact | info]")
@@ -0,0 +1,135 @@
+import numpy as np
+
+# Flattened RandomForestRegressor for low-overhead inference.
+#
+# Every tree is packed into shared arrays (feature, threshold, left, right, value)
+# with global node ids; leaves point to themselves with an infinite threshold, so
+# all trees are walked together for a fixed number of steps (the deepest tree's
+# depth) with a handful of vectorized gathers per step. Inputs are cast to float32
+# and tree outputs are summed in estimator order before dividing, exactly like
+# sklearn, so predictions are bit-for-bit identical to model.predict (with n_jobs=1;
+# sklearn's own result depends on thread completion order when n_jobs > 1).
+#
+# The vectorized walk wins for the small batches of online scoring. For large
+# batches the per-row cost of numpy gathers dominates, so when the sklearn trees
+# are available each tree's compiled apply() is used instead (still without the
+# forest's validation and joblib dispatch).
+
+CHUNK_ROWS = 4096
+BATCH_ROWS = 32
+
+
+class CompiledForest:
+
+    def __init__(self, feature, threshold, left, right, value, missing_left, roots, max_depth, n_features,
+                 trees=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.trees = trees
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def apply(self, X):
+        # -> (n_trees, n_rows) global leaf ids
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        flat = X.ravel()
+        row_base = (np.arange(n_rows) * self.n_features)[None, :]
+        node = np.repeat(self.roots[:, None], n_rows, axis=1)
+        has_nan = self.missing_left is not None and np.isnan(X).any()
+        for _ in range(self.max_depth):
+            x = flat[row_base + self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.missing_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def leaves(self, X):
+        # apply() for any batch size: per-tree compiled apply() on large batches when
+        # the sklearn trees are available (same switch as predict)
+        if self.trees is not None and X.shape[0] >= BATCH_ROWS:
+            X = np.ascontiguousarray(X, dtype=np.float32)
+            return np.stack([root + tree.apply(X) for root, tree in zip(self.roots, self.trees)])
+        return self.apply(X)
+
+    def predict(self, X):
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features}")
+        if self.trees is not None and X.shape[0] >= BATCH_ROWS:
+            return self._predict_per_tree(X)
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            leaf_values = self.value[self.apply(X[start:start + CHUNK_ROWS])]
+            y_hat = np.zeros(leaf_values.shape[1], dtype=np.float64)
+            # Sequential sum in estimator order (np.sum would reorder the additions)
+            for tree_values in leaf_values:
+                y_hat += tree_values
+            y_hat /= self.n_trees
+            out[start:start + CHUNK_ROWS] = y_hat
+        return out
+
+    def _predict_per_tree(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y_hat = np.zeros(X.shape[0], dtype=np.float64)
+        for root, tree in zip(self.roots, self.trees):
+            y_hat += self.value[root + tree.apply(X)]
+        y_hat /= self.n_trees
+        return y_hat
+
+
+def compile_forest(model):
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests are supported")
+
+    features, thresholds, lefts, rights, values, missing, roots = [], [], [], [], [], [], []
+    offset, max_depth, any_missing = 0, 0, False
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        ids = np.arange(offset, offset + n)
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        lefts.append(np.where(is_leaf, ids, tree.children_left + offset))
+        rights.append(np.where(is_leaf, ids, tree.children_right + offset))
+        values.append(tree.value[:, 0, 0])
+        mgl = getattr(tree, "missing_go_to_left", None)
+        if mgl is not None:
+            any_missing = True
+            missing.append(np.where(is_leaf, True, np.asarray(mgl, dtype=bool)))
+        else:
+            missing.append(np.ones(n, dtype=bool))
+        roots.append(offset)
+        max_depth = max(max_depth, tree.max_depth)
+        offset += n
+
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.intp),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(np.intp),
+        right=np.concatenate(rights).astype(np.intp),
+        value=np.concatenate(values).astype(np.float64),
+        missing_left=np.concatenate(missing) if any_missing else None,
+        roots=np.asarray(roots, dtype=np.intp),
+        max_depth=max_depth,
+        n_features=model.n_features_in_,
+        trees=[estimator.tree_ for estimator in model.estimators_]
+    )
@@ -0,0 +1,48 @@
+import gc
+import os
+
+# Shared-memory serving for app.py:
+#
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# The master imports the app and loads the models, encoders and SHAP background data
+# once (assets.preload), then forks the workers, which share those pages copy-on-write.
+# GC is disabled in the master while loading and everything loaded is frozen before
+# forking, so collections in the workers never write to the shared objects. GC is
+# re-enabled in the master right after the freeze, since its registry watcher keeps
+# loading new versions. Each worker still hot-swaps to new model versions on its own
+# (that copy is private to the worker).
+# Measure with: python -m benchmarks.worker_memory
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 4))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+PRELOAD_EXPLAINER = os.environ.get("PRELOAD_EXPLAINER", "0") == "1"
+
+if preload_app:
+    # Avoid freed "holes" in pages the workers will share
+    gc.disable()
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported, before any worker is forked
+    if not preload_app:
+        return
+    import assets
+
+    assets.preload(explainer=PRELOAD_EXPLAINER)
+    gc.freeze()
+    # Frozen objects are never scanned, so collecting in the master leaves them alone
+    gc.enable()
+    server.log.info("Preloaded models and data, %d objects frozen for sharing", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+    else:
+        # Every worker loads its own copy
+        import assets
+
+        assets.preload(explainer=PRELOAD_EXPLAINER)
@@ -0,0 +1,134 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+import pandas as pd
+
+import feature_store
+
+DATA_PATH = "credit_score_database.csv"
+
+# Retraining policy: whichever triggers first (0 disables a trigger)
+RETRAIN_EVERY_ROWS = int(os.environ.get("RETRAIN_EVERY_ROWS", 100))
+RETRAIN_EVERY_SECONDS = float(os.environ.get("RETRAIN_EVERY_SECONDS", 3600))
+
+
+class RetrainPolicy:
+    # drift_check: optional callable() -> bool that forces a retrain when inputs shift
+
+    def __init__(self, every_rows=RETRAIN_EVERY_ROWS, every_seconds=RETRAIN_EVERY_SECONDS, drift_check=None):
+        self.every_rows = every_rows
+        self.every_seconds = every_seconds
+        self.drift_check = drift_check
+
+    def reason(self, rows_since, seconds_since):
+        if rows_since == 0:
+            return None
+        if self.every_rows and rows_since >= self.every_rows:
+            return f"{rows_since} new rows"
+        if self.every_seconds and seconds_since >= self.every_seconds:
+            return f"{seconds_since:.0f}s since last retrain"
+        if self.drift_check is not None and self.drift_check():
+            return "input drift detected"
+        return None
+
+
+class IngestionQueue:
+    # submit() only enqueues. A daemon worker appends queued rows in batches to the
+    # feature store (or the CSV when no store has been imported), never rewriting it,
+    # and requests a retrain from the training job runner when the policy says so. The
+    # runner fits in another process, one job per dataset, folding triggers that arrive
+    # while a job runs into a single follow-up job.
+
+    def __init__(self, data_path=DATA_PATH, policy=None, incremental=True):
+        self.data_path = data_path
+        self.policy = policy or RetrainPolicy()
+        self.incremental = incremental
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._rows_since_retrain = 0
+        self._last_retrain = time.time()
+        self._feature_store = None
+        self._worker = threading.Thread(target=self._run, name="ingestion-worker", daemon=True)
+        self._worker.start()
+
+    def submit(self, row: dict):
+        self._queue.put(dict(row))
+
+    def _drain(self, block_timeout):
+        rows = []
+        try:
+            rows.append(self._queue.get(timeout=block_timeout))
+            while True:
+                rows.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return rows
+
+    def _append(self, rows):
+        if feature_store.exists():
+            self._store().append(rows)
+            return
+        new_rows = pd.DataFrame(rows)
+        if os.path.exists(self.data_path):
+            # Keep the existing header; O(batch) append instead of an O(N) rewrite
+            columns = pd.read_csv(self.data_path, nrows=0).columns
+            new_rows.reindex(columns=columns).to_csv(self.data_path, mode="a", header=False, index=False)
+        else:
+            new_rows.to_csv(self.data_path, index=False)
+
+    def _store(self):
+        if self._feature_store is None:
+            self._feature_store = feature_store.FeatureStore()
+        return self._feature_store
+
+    def flush(self):
+        # Blocks until every submitted row has been appended (used at exit and by CLIs)
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            rows = self._drain(block_timeout=1.0)
+            with self._lock:
+                if rows:
+                    try:
+                        self._append(rows)
+                        self._rows_since_retrain += len(rows)
+                    except Exception as e:
+                        print(f"❌ Failed to append {len(rows)} rows: {e}")
+                    finally:
+                        for _ in rows:
+                            self._queue.task_done()
+                reason = self.policy.reason(self._rows_since_retrain, time.time() - self._last_retrain)
+            if reason:
+                self.request_retrain(reason)
+
+    def request_retrain(self, reason="manual"):
+        # Hands the fit to the out-of-process training runner and returns immediately
+        from training_jobs import get_training_runner
+
+        with self._lock:
+            self._rows_since_retrain = 0
+            self._last_retrain = time.time()
+        print(f"🔁 Retraining ({reason})")
+        return get_training_runner().submit(self.data_path, incremental=self.incremental, reason=reason)
+
+
+_ingestion_queue = None
+_ingestion_lock = threading.Lock()
+
+
+def get_ingestion_queue():
+    global _ingestion_queue
+    with _ingestion_lock:
+        if _ingestion_queue is None:
+            import assets
+
+            # Retrain early when the inputs drift away from the training data
+            monitor = assets.drift_monitor()
+            policy = RetrainPolicy(drift_check=monitor.drift_check if monitor is not None else None)
+            _ingestion_queue = IngestionQueue(policy=policy)
+            atexit.register(_ingestion_queue.flush)
+        return _ingestion_queue
@@ -0,0 +1,298 @@
+import math
+import re
+
+# Request schemas for the two served models, derived from what each fitted model
+# actually accepts and compiled once per model version (assets registers them as
+# "input_schema" LiveModel preparers), so a request is checked and coerced with one
+# dict walk before any DataFrame is built:
+#
+#   schema.validate(row)          -> (coerced row, None) or (None, error message)
+#   schema.validate_many(rows)    -> (valid indices, coerced rows, {index: error})
+#
+# Coercions: numeric strings -> float; categories matched case/space-insensitively
+# (plus ALIASES) to the model's own spelling; "true"/"yes"/1 -> True for bool
+# columns; bill_payment_consistency both ways between the form's labels (Usually,
+# Rarely, ...) and the 0-1 scores the credit_model database uses. Numbers outside
+# RANGES (loose sanity bounds, not the training range) are rejected.
+BILL_PAYMENT_COLUMN = "bill_payment_consistency"
+BILL_PAYMENT_SCORES = {"Always": 1.0, "Usually": 0.7, "Sometimes": 0.4, "Rarely": 0.2, "Never": 0.0}
+
+# (min, max), None for unbounded
+RANGES = {
+    "age": (16, 100),
+    "num_occupants": (1, 50),
+    "cash_inflow": (0, None),
+    "avg_bank_balance": (None, None),
+    "bill_payment_consistency": (0, 1),
+    "bnpl ratio": (0, 1),
+    "rent_amount": (0, None),
+    "grade_or_cgpa": (0, 10),
+    "age_to_employment_ratio": (0, 1)
+}
+
+# Spellings of one category across the two models / the web form
+ALIASES = {
+    "housing_type": [("PG/Hostel", "Pg", "PG", "Hostel")],
+    "education_level": [("Postgraduate", "PostGraduate", "Post Graduate")]
+}
+
+TRUE_VALUES = {"true", "yes", "y", "1"}
+FALSE_VALUES = {"false", "no", "n", "0"}
+
+# Raw spellings remembered per category field after a normalized match
+MAX_REMEMBERED_SPELLINGS = 256
+
+_SEPARATORS = re.compile(r"[\s_]+")
+_MISSING = object()
+
+
+def _normalize(value):
+    return _SEPARATORS.sub("-", value.strip().lower())
+
+
+# --- FIELD SPECS ---
+
+def number_field(name, ranges=RANGES):
+    low, high = ranges.get(name, (None, None))
+    return {"name": name, "type": "number", "min": low, "max": high}
+
+
+def category_field(name, values, aliases=ALIASES):
+    return {"name": name, "type": "category", "values": [str(v) for v in values],
+            "aliases": [list(group) for group in aliases.get(name, [])]}
+
+
+def bool_field(name):
+    return {"name": name, "type": "bool"}
+
+
+def bill_payment_field(name, output, values=None):
+    # output="number": labels -> score; output="label": scores -> nearest of values
+    return {"name": name, "type": "bill_payment", "output": output,
+            "values": list(values if values is not None else BILL_PAYMENT_SCORES)}
+
+
+# --- COMPILED COERCERS (raise ValueError with the message for the client) ---
+
+def _to_float(value, name):
+    # Ints too large for a float (10**400) and non-finite results ("inf", "nan")
+    # are rejected like any other non-number
+    if value.__class__ is float or value.__class__ is int or isinstance(value, str) or (
+            isinstance(value, (int, float)) and not isinstance(value, bool)):
+        try:
+            x = float(value)
+        except (ValueError, OverflowError):
+            pass
+        else:
+            if math.isfinite(x):
+                return x
+    raise ValueError(f"Field '{name}' must be numeric")
+
+
+def _compile_number(spec):
+    name, low, high = spec["name"], spec["min"], spec["max"]
+    if low is not None and high is not None:
+        bounds = f"between {low} and {high}"
+    else:
+        bounds = f"at least {low}" if low is not None else f"at most {high}"
+
+    def coerce(value):
+        x = _to_float(value, name)
+        if (low is not None and x < low) or (high is not None and x > high):
+            raise ValueError(f"Field '{name}' must be {bounds} (got {x:g})")
+        return x
+
+    return coerce
+
+
+def _category_lookup(values, aliases):
+    # normalized spelling -> canonical value; the first class wins when two only
+    # differ in case (the credit_model has both "Semi-Urban" and "Semi-urban")
+    lookup = {}
+    for value in values:
+        lookup.setdefault(_normalize(value), value)
+    for group in aliases:
+        target = next((lookup[_normalize(a)] for a in group if _normalize(a) in lookup), None)
+        if target is not None:
+            for alias in group:
+                lookup.setdefault(_normalize(alias), target)
+    return lookup
+
+
+def _compile_category(spec):
+    name, values = spec["name"], spec["values"]
+    exact = {value: value for value in values}
+    lookup = _category_lookup(values, spec["aliases"])
+    allowed = ", ".join(values)
+
+    def coerce(value):
+        if value.__class__ is str:
+            canonical = exact.get(value)
+            if canonical is not None:
+                return canonical
+            canonical = lookup.get(_normalize(value))
+            if canonical is not None:
+                if len(exact) < MAX_REMEMBERED_SPELLINGS:
+                    exact[value] = canonical
+                return canonical
+        raise ValueError(f"Field '{name}' has unknown value {value!r} (expected one of: {allowed})")
+
+    return coerce
+
+
+def _compile_bool(spec):
+    name = spec["name"]
+
+    def coerce(value):
+        if value is True or value is False:
+            return value
+        if isinstance(value, str):
+            key = value.strip().lower()
+            if key in TRUE_VALUES:
+                return True
+            if key in FALSE_VALUES:
+                return False
+        elif isinstance(value, (int, float)) and value in (0, 1):
+            return bool(value)
+        raise ValueError(f"Field '{name}' must be true or false (got {value!r})")
+
+    return coerce
+
+
+def _compile_bill_payment(spec):
+    name, labels = spec["name"], spec["values"]
+    lookup = _category_lookup(labels, [])
+    to_score = _compile_number({"name": name, "min": 0, "max": 1})
+    expected = f"expected one of: {', '.join(labels)} or a score between 0 and 1"
+
+    if spec["output"] == "number":
+        scores = {label: BILL_PAYMENT_SCORES[label] for label in labels}
+
+        def coerce(value):
+            if value.__class__ is str:
+                label = lookup.get(_normalize(value))
+                if label is not None:
+                    return scores[label]
+                try:
+                    return to_score(value)
+                except ValueError:
+                    raise ValueError(f"Field '{name}' has unknown value {value!r} ({expected})") from None
+            return to_score(value)
+
+        return coerce
+
+    # Scores map to the nearest label the model knows
+    scored = sorted((BILL_PAYMENT_SCORES[label], label) for label in labels if label in BILL_PAYMENT_SCORES)
+
+    def coerce(value):
+        if value.__class__ is str:
+            label = lookup.get(_normalize(value))
+            if label is not None:
+                return label
+            try:
+                x = to_score(value)
+            except ValueError:
+                raise ValueError(f"Field '{name}' has unknown value {value!r} ({expected})") from None
+        else:
+            x = to_score(value)
+        if not scored:
+            raise ValueError(f"Field '{name}' must be one of: {', '.join(labels)}")
+        return min(scored, key=lambda item: abs(item[0] - x))[1]
+
+    return coerce
+
+
+COMPILERS = {
+    "number": _compile_number,
+    "category": _compile_category,
+    "bool": _compile_bool,
+    "bill_payment": _compile_bill_payment
+}
+
+
+# --- SCHEMA ---
+
+class InputSchema:
+
+    def __init__(self, fields, name=""):
+        self.fields = list(fields)
+        self.name = name
+        self.columns = [spec["name"] for spec in self.fields]
+        self._coercers = [(spec["name"], COMPILERS[spec["type"]](spec)) for spec in self.fields]
+
+    def spec(self):
+        # JSON-able description (GET /schema)
+        return {"model": self.name, "fields": self.fields}
+
+    def validate(self, row):
+        # Every problem is reported at once; extra keys are dropped
+        if not isinstance(row, dict):
+            return None, "Expected a JSON object"
+        clean, missing, errors = {}, [], []
+        for col, coerce in self._coercers:
+            value = row.get(col, _MISSING)
+            if value is _MISSING:
+                missing.append(col)
+                continue
+            try:
+                clean[col] = coerce(value)
+            except ValueError as e:
+                errors.append(str(e))
+        if missing:
+            errors.insert(0, f"Missing required fields: {', '.join(missing)}")
+        if errors:
+            return None, "; ".join(errors)
+        return clean, None
+
+    def validate_many(self, rows):
+        # -> (indices of valid rows, their coerced rows, {index: error})
+        valid_index, valid_rows, errors = [], [], {}
+        validate = self.validate
+        for i, row in enumerate(rows):
+            if isinstance(row, ValueError):
+                errors[i] = f"Invalid JSON: {row}"
+                continue
+            clean, error = validate(row)
+            if error is None:
+                valid_index.append(i)
+                valid_rows.append(clean)
+            else:
+                errors[i] = error
+        return valid_index, valid_rows, errors
+
+
+# --- BUILDERS ---
+
+def credit_model_schema(pipeline):
+    # From a CreditPipeline's schema: label-encoded columns are categories (the
+    # False/True one a bool), bill payment is a 0-1 score
+    schema = pipeline.schema
+    fields = []
+    for col in schema["features"]:
+        values = schema["categorical"].get(col)
+        if col == BILL_PAYMENT_COLUMN and values is None:
+            fields.append(bill_payment_field(col, "number"))
+        elif values is None:
+            fields.append(number_field(col))
+        elif sorted(values) == ["False", "True"]:
+            fields.append(bool_field(col))
+        else:
+            fields.append(category_field(col, values))
+    return InputSchema(fields, pipeline.name)
+
+
+def scoring_pipeline_schema(model, name=""):
+    # From the fitted preprocessor of app.py's sklearn Pipeline: its numeric columns
+    # and the OneHotEncoder's categories (bill payment is a label there)
+    from evaluatemodel import suggestion_engine
+
+    engine = suggestion_engine(model)
+    fields = [number_field(col) for col in engine.num_features]
+    for col, categories in zip(engine.cat_features, engine.categories):
+        if col == BILL_PAYMENT_COLUMN:
+            fields.append(bill_payment_field(col, "label", [str(c) for c in categories]))
+        elif sorted(str(c) for c in categories) == ["False", "True"]:
+            fields.append(bool_field(col))
+        else:
+            fields.append(category_field(col, categories))
+    return InputSchema(fields, name)
@@ -0,0 +1,298 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+
+# Hot-path timers and counters, rendered in the Prometheus text format by app.py's
+# GET /metrics.
+#
+#   with instrumentation.stage("predict"):
+#       ...
+#
+# INSTRUMENTATION=0 turns every hook into a shared no-op (app.py then registers no
+# request hooks and FeatureEncoder keeps its plain fallback). Metrics are per process:
+# under gunicorn each worker reports its own, scrape them individually or aggregate.
+#
+# SLOW_REQUEST_MS > 0 also starts a sampling profiler: while a request is in flight a
+# background thread records its stack every PROFILE_INTERVAL_MS, and requests slower
+# than the threshold keep their collapsed stacks (flamegraph.pl format) in
+# slow_requests() / GET /debug/slow-requests.
+INSTRUMENTATION = os.environ.get("INSTRUMENTATION", "1") == "1"
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", 0))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+MAX_SLOW_REQUESTS = int(os.environ.get("MAX_SLOW_REQUESTS", 20))
+MAX_STACK_DEPTH = 64
+MAX_STACKS_PER_REQUEST = 25
+
+# Seconds; covers cached lookups (sub-ms) up to cold SHAP explainers
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_METRIC = "credit_stage_duration_seconds"
+REQUEST_METRIC = "credit_request_duration_seconds"
+UNKNOWN_METRIC = "credit_unknown_category_total"
+SLOW_METRIC = "credit_slow_requests_total"
+
+HELP = {
+    STAGE_METRIC: ("histogram", "Time spent per hot-path stage (parse, preprocess, predict, suggestions, shap, saabas, leaf_table)"),
+    REQUEST_METRIC: ("histogram", "Flask request latency by endpoint, status and model version"),
+    UNKNOWN_METRIC: ("counter", "Categorical values missing from the label encoders (encoded as classes_[0])"),
+    SLOW_METRIC: ("counter", f"Requests slower than SLOW_REQUEST_MS ({SLOW_REQUEST_MS:g} ms)")
+}
+
+
+class Histogram:
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_histograms = {}  # (metric, labels tuple) -> Histogram
+_counters = {}  # (metric, labels tuple) -> int
+_lock = threading.Lock()
+
+
+def observe(metric, labels, seconds):
+    # labels: tuple of (name, value) pairs, in a fixed order per metric
+    with _lock:
+        histogram = _histograms.get((metric, labels))
+        if histogram is None:
+            histogram = _histograms[(metric, labels)] = Histogram()
+        histogram.observe(seconds)
+
+
+def increment(metric, labels, n=1):
+    with _lock:
+        _counters[(metric, labels)] = _counters.get((metric, labels), 0) + n
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+    _slow_requests.clear()
+
+
+# --- STAGE TIMERS ---
+
+class _Stage:
+    __slots__ = ("labels", "start")
+
+    def __init__(self, name):
+        self.labels = (("stage", name),)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(STAGE_METRIC, self.labels, time.perf_counter() - self.start)
+        return False
+
+
+class _NoOp:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoOp()
+
+
+def stage(name):
+    return _Stage(name) if INSTRUMENTATION else _NOOP
+
+
+def count_unknown(column, n=1, model=""):
+    if INSTRUMENTATION:
+        increment(UNKNOWN_METRIC, (("model", model), ("column", column)), n)
+
+
+# --- REQUESTS + SLOW REQUEST PROFILER ---
+
+_local = threading.local()
+_inflight = {}  # thread id -> Counter of collapsed stacks
+_slow_requests = deque(maxlen=MAX_SLOW_REQUESTS)
+_sampler = None
+_sampler_pid = None
+_sampler_lock = threading.Lock()
+
+
+def request_started(endpoint):
+    _local.request = {"endpoint": endpoint or "unknown", "model_version": "", "start": time.perf_counter()}
+    if SLOW_REQUEST_MS > 0:
+        _ensure_sampler()
+        _inflight[threading.get_ident()] = Counter()
+
+
+def label_request(model_version):
+    # Called by handlers once they know which model version serves the request
+    request = getattr(_local, "request", None)
+    if request is not None:
+        request["model_version"] = model_version
+
+
+def request_finished(status):
+    request = getattr(_local, "request", None)
+    if request is None:
+        return
+    _local.request = None
+    seconds = time.perf_counter() - request["start"]
+    endpoint, version = request["endpoint"], request["model_version"]
+    observe(REQUEST_METRIC, (("endpoint", endpoint), ("status", str(status)), ("model_version", version)), seconds)
+
+    samples = _inflight.pop(threading.get_ident(), None)
+    if SLOW_REQUEST_MS > 0 and seconds * 1000 >= SLOW_REQUEST_MS:
+        increment(SLOW_METRIC, (("endpoint", endpoint),))
+        _slow_requests.append({
+            "endpoint": endpoint,
+            "status": status,
+            "model_version": version,
+            "duration_ms": round(seconds * 1000, 3),
+            "finished_at": time.time(),
+            "samples": sum(samples.values()) if samples else 0,
+            "stacks": dict(samples.most_common(MAX_STACKS_PER_REQUEST)) if samples else {}
+        })
+        print(f"🐢 Slow request {endpoint} took {seconds * 1000:.1f} ms "
+              f"({sum(samples.values()) if samples else 0} stack samples)")
+
+
+def slow_requests():
+    return list(_slow_requests)
+
+
+def _collapse(frame):
+    # "file:function;file:function;..." from the outermost frame in
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _sample_loop():
+    interval = PROFILE_INTERVAL_MS / 1000
+    while True:
+        time.sleep(interval)
+        if not _inflight:
+            continue
+        frames = sys._current_frames()
+        for ident, samples in list(_inflight.items()):
+            frame = frames.get(ident)
+            if frame is not None:
+                samples[_collapse(frame)] += 1
+        del frames
+
+
+def _ensure_sampler():
+    # Started on first use so it runs in the serving process (after any fork)
+    global _sampler, _sampler_pid
+    if _sampler is not None and _sampler_pid == os.getpid():
+        return
+    with _sampler_lock:
+        if _sampler is None or _sampler_pid != os.getpid():
+            _inflight.clear()
+            _sampler = threading.Thread(target=_sample_loop, name="slow-request-sampler", daemon=True)
+            _sampler.start()
+            _sampler_pid = os.getpid()
+
+
+def _reinit_after_fork():
+    global _lock, _sampler_lock
+    _lock = threading.Lock()
+    _sampler_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+# --- PROMETHEUS EXPOSITION ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _header(lines, metric, kind, text):
+    lines.append(f"# HELP {metric} {text}")
+    lines.append(f"# TYPE {metric} {kind}")
+
+
+def _render_live_models(lines):
+    # Only models this process has already loaded
+    from model_registry import live_models
+
+    models = live_models()
+    if not models:
+        return
+    _header(lines, "credit_model_info", "gauge", "Model version currently served (always 1)")
+    for live in models:
+        lines.append(f"credit_model_info{_labels((('model', live.name), ('version', live.version)))} 1")
+
+
+def _render_prediction_cache(lines):
+    import assets
+
+    cache = assets.prediction_cache()
+    if cache is None:
+        return
+    metrics = cache.metrics()
+    _header(lines, "credit_prediction_cache_entries", "gauge", "Entries in the in-memory prediction cache")
+    lines.append(f"credit_prediction_cache_entries {metrics['entries']}")
+    for kind in ("hits", "misses"):
+        metric = f"credit_prediction_cache_{kind}_total"
+        _header(lines, metric, "counter", f"Prediction cache {kind} by namespace")
+        for namespace, counts in metrics["namespaces"].items():
+            lines.append(f"{metric}{_labels((('namespace', namespace),))} {counts[kind]}")
+
+
+def render():
+    # Prometheus text exposition format 0.0.4
+    with _lock:
+        histograms = {key: (list(h.counts), h.sum, h.count) for key, h in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    for metric, (kind, text) in HELP.items():
+        if kind == "histogram":
+            series = sorted((labels, h) for (name, labels), h in histograms.items() if name == metric)
+        else:
+            series = sorted((labels, v) for (name, labels), v in counters.items() if name == metric)
+        if not series:
+            continue
+        _header(lines, metric, kind, text)
+        for labels, value in series:
+            if kind == "counter":
+                lines.append(f"{metric}{_labels(labels)} {value}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {total:.9g}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+
+    _render_live_models(lines)
+    _render_prediction_cache(lines)
+    return "\n".join(lines) + "\n"
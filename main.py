@@ -1,97 +1,71 @@
-import joblib
-import numpy as np
 import pandas as pd
-import shap
-import matplotlib.pyplot as plt
-from update_model import retrain_model_with_input
+import assets
+from instrumentation import stage
+from preprocessing import FEATURE_ORDER
 
 import warnings
 warnings.filterwarnings("ignore")
 
 # Constants
-MODEL_PATH = "credit_model.pkl"  # Consistent with training
-ENCODER_PATH = "label_encoders.pkl"
-BACKGROUND_DATA_PATH = "credit_score_database.csv"
-
-FEATURE_ORDER = [
-    "age",
-    "num_occupants",
-    "cash_inflow",
-    "avg_bank_balance",
-    "bill_payment_consistency",
-    "bnpl_used",
-    "bnpl ratio",
-    "rent_amount",
-    "location_type",
-    "education_level",
-    "income_type",
-    "grade_or_cgpa",
-    "housing_type",
-    "age_to_employment_ratio"
-]
+MODEL_PATH = assets.MODEL_PATH  # Consistent with training
+ENCODER_PATH = assets.ENCODER_PATH
+BACKGROUND_DATA_PATH = assets.BACKGROUND_DATA_PATH
+BACKGROUND_SAMPLE_SIZE = assets.BACKGROUND_SAMPLE_SIZE
+REGISTRY_NAME = assets.CREDIT_MODEL_NAME
 
-# Load model and encoders
-model = joblib.load(MODEL_PATH)
-label_encoders = joblib.load(ENCODER_PATH)
-background_df = pd.read_csv(BACKGROUND_DATA_PATH)
+# Model, encoders, background data and explainer are loaded on first use through
+# the shared asset cache (and hot-swapped when a new version is published).
 
 # --- PREPROCESS FUNCTIONS ---
 
-def preprocess_dataframe(df):
-    df = df.copy()
-
-    # Keep only columns needed
-    df = df[[col for col in FEATURE_ORDER if col in df.columns]]
-
-    for col in label_encoders:
-        if col in df.columns:
-            df[col] = df[col].apply(lambda x: str(x) if isinstance(x, bool) else x)
-            df[col] = df[col].fillna(np.nan)
-
-            known_classes = set(label_encoders[col].classes_)
-            df[col] = df[col].apply(lambda x: x if x in known_classes else label_encoders[col].classes_[0])
-
-            df[col] = label_encoders[col].transform(df[col])
-
-    df = df[FEATURE_ORDER]
-    return df.astype(float)
+def preprocess_dataframe(df, snapshot=None):
+    snapshot = snapshot or assets.credit_model().get()
+    X = snapshot.derived["pipeline"].transform(df)
+    return pd.DataFrame(X, columns=FEATURE_ORDER, index=df.index)
 
-def preprocess_input(user_input):
-    input_df = pd.DataFrame([user_input])
-    for col in label_encoders:
-        if col in input_df.columns:
-            input_df[col] = input_df[col].apply(lambda x: str(x) if isinstance(x, bool) else x)
-            input_df[col] = input_df[col].fillna(np.nan)
-
-            known_classes = set(label_encoders[col].classes_)
-            input_df[col] = input_df[col].apply(lambda x: x if x in known_classes else label_encoders[col].classes_[0])
-
-            input_df[col] = label_encoders[col].transform(input_df[col])
-    input_df = input_df[FEATURE_ORDER]
-    return input_df.astype(float)
+def preprocess_input(user_input, snapshot=None):
+    snapshot = snapshot or assets.credit_model().get()
+    with stage("preprocess"):
+        X = snapshot.derived["pipeline"].transform(user_input)
+        return pd.DataFrame(X, columns=FEATURE_ORDER)
 
 # --- SHAP SETUP ---
 
-background_X = preprocess_dataframe(background_df)
-background_X_sample = background_X.sample(n=100, random_state=42)
+def background_sample(snapshot=None):
+    # Preprocessed 100-row background sample; with SHAP_FEATURE_PERTURBATION=interventional
+    # the explainer integrates over it
+    return assets.background_matrix(snapshot or assets.credit_model().get())
 
 # --- PREDICTION + EXPLANATION ---
 
+def _predict_row(snapshot, processed):
+    with stage("predict"):
+        prediction = snapshot.derived["pipeline"].predict(processed.to_numpy())
+    return round(prediction[0], 2)
+
 def predict_credit_score(user_input):
-    processed = preprocess_input(user_input)
-    prediction = model.predict(processed)
-    return round(prediction[0], 2), processed
+    live = assets.credit_model()
+    snapshot = live.get()
+    processed = preprocess_input(user_input, snapshot)
+    cache = assets.prediction_cache()
+    if cache is None:
+        return _predict_row(snapshot, processed), processed
+    score = cache.get_or_compute("score", live, snapshot, processed.iloc[0].to_numpy(),
+                                 lambda: _predict_row(snapshot, processed))
+    return score, processed
 
 def explain_prediction(processed_input):
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(processed_input)
+    import shap
+    from explanation import shap_row
+
+    row_values, base_value = shap_row(processed_input)
 
     print("\n📉 SHAP Feature Impact (Negative means lowering score):")
-    for name, value in zip(processed_input.columns, shap_values[0]):
+    for name, value in zip(processed_input.columns, row_values):
         print(f"{name}: {value:.2f}")
 
-    shap.plots.waterfall(shap.Explanation(values=shap_values[0],
-                                          base_values=explainer.expected_value,
+    shap.plots.waterfall(shap.Explanation(values=row_values,
+                                          base_values=base_value,
                                           data=processed_input.iloc[0],
                                           feature_names=processed_input.columns), max_display=10)
 
@@ -189,6 +163,8 @@ sample_users = [
 # --- MAIN EXECUTION ---
 
 if __name__ == "__main__":
+    from update_model import retrain_model_with_input
+
     score, processed = predict_credit_score(sample_users[4])
     print(f"\n📊 Predicted Credit Score: {score}")
     explain_prediction(processed)
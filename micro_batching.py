@@ -0,0 +1,76 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Micro-batching for threaded servers: concurrent callers submit single rows, one
+# worker thread collects whatever arrives within MAX_LATENCY_MS of the first row (or
+# until MAX_BATCH_SIZE rows) and scores them as one matrix, then hands each caller
+# its own result. Only pays off when requests actually overlap (threaded/gthread
+# workers); with one request at a time it just adds up to MAX_LATENCY_MS.
+MICRO_BATCHING = os.environ.get("PREDICT_MICRO_BATCHING", "0") == "1"
+MAX_LATENCY_MS = float(os.environ.get("PREDICT_BATCH_MAX_LATENCY_MS", 2.0))
+MAX_BATCH_SIZE = int(os.environ.get("PREDICT_BATCH_MAX_SIZE", 64))
+
+
+class MicroBatcher:
+    # score_fn(list of items) -> list of results in the same order
+
+    def __init__(self, score_fn, max_batch_size=MAX_BATCH_SIZE, max_latency_ms=MAX_LATENCY_MS, name="micro-batcher"):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self):
+        # Started on first use so it runs in the process that serves (after any fork)
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.score_fn(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    @property
+    def mean_batch_size(self):
+        return self.items / self.batches if self.batches else 0.0
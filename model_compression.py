@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from forest_engine import CompiledForest
+
+# Compact, memory-mappable export of a RandomForestRegressor.
+#
+#   compressed_model/meta.json         shapes, source fingerprint, pruning settings
+#   compressed_model/<array>.npy       feature/left/right/roots int32, threshold/value float32,
+#                                      missing_left bool
+#
+# Loaded with np.load(mmap_mode="r"), so the arrays are read-only page cache that
+# every process (and forked worker) shares instead of each holding a private copy.
+#
+# Thresholds are rounded *down* to float32: sklearn compares float32 inputs with
+# float64 thresholds, and for any float32 x, x <= t exactly when x <= floor32(t), so
+# this is lossless. Depth capping, subtree pruning and float32 leaf values are not;
+# the export report shows how far predictions move.
+COMPRESSED_MODEL_DIR = os.environ.get("COMPRESSED_MODEL_DIR", "compressed_model")
+MAX_DEPTH = None
+# Collapse a subtree when no leaf under it is further than this from the node's mean
+LEAF_TOLERANCE = 0.0
+ARRAYS = ("feature", "threshold", "left", "right", "value", "missing_left", "roots")
+
+
+def model_fingerprint(model):
+    # Identifies the exact trees an export was made from
+    digest = hashlib.sha1()
+    for estimator in model.estimators_:
+        digest.update(estimator.tree_.threshold.tobytes())
+        digest.update(estimator.tree_.value.tobytes())
+    return digest.hexdigest()
+
+
+def _float32_floor(values):
+    rounded = values.astype(np.float32)
+    too_big = rounded.astype(np.float64) > values
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+def _prune_tree(tree, max_depth=MAX_DEPTH, leaf_tolerance=LEAF_TOLERANCE):
+    # -> kept node ids in preorder, {old id: is leaf}, depth of the pruned tree.
+    # sklearn numbers children after their parents, so a reverse pass gives subtree bounds.
+    left, right = tree.children_left, tree.children_right
+    value = tree.value[:, 0, 0]
+    low, high = value.copy(), value.copy()
+    for node in range(tree.node_count - 1, -1, -1):
+        if left[node] != -1:
+            low[node] = min(low[left[node]], low[right[node]])
+            high[node] = max(high[left[node]], high[right[node]])
+
+    kept, leaf, depth = [], {}, 0
+    stack = [(0, 0)]
+    while stack:
+        node, node_depth = stack.pop()
+        kept.append(node)
+        depth = max(depth, node_depth)
+        leaf[node] = (
+            left[node] == -1
+            or (max_depth is not None and node_depth >= max_depth)
+            or max(high[node] - value[node], value[node] - low[node]) <= leaf_tolerance
+        )
+        if not leaf[node]:
+            stack.append((right[node], node_depth + 1))
+            stack.append((left[node], node_depth + 1))
+    return kept, leaf, depth
+
+
+def compress_forest(model, max_depth=MAX_DEPTH, leaf_tolerance=LEAF_TOLERANCE, value_dtype=np.float32):
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests are supported")
+
+    features, thresholds, lefts, rights, values, missing, roots = [], [], [], [], [], [], []
+    offset, depth = 0, 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        kept, leaf, tree_depth = _prune_tree(tree, max_depth, leaf_tolerance)
+        new_id = {node: offset + i for i, node in enumerate(kept)}
+        kept = np.asarray(kept)
+        is_leaf = np.array([leaf[node] for node in kept])
+        ids = np.arange(offset, offset + len(kept))
+
+        features.append(np.where(is_leaf, 0, tree.feature[kept]))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold[kept]))
+        lefts.append(np.where(is_leaf, ids, [new_id.get(n, -1) for n in tree.children_left[kept]]))
+        rights.append(np.where(is_leaf, ids, [new_id.get(n, -1) for n in tree.children_right[kept]]))
+        values.append(tree.value[kept, 0, 0])
+        mgl = getattr(tree, "missing_go_to_left", None)
+        missing.append(np.where(is_leaf, True, np.asarray(mgl, dtype=bool)[kept]) if mgl is not None
+                       else np.ones(len(kept), dtype=bool))
+        roots.append(offset)
+        depth = max(depth, tree_depth)
+        offset += len(kept)
+
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=_float32_floor(np.concatenate(thresholds)),
+        left=np.concatenate(lefts).astype(np.int32),
+        right=np.concatenate(rights).astype(np.int32),
+        value=np.concatenate(values).astype(value_dtype),
+        missing_left=np.concatenate(missing),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=depth,
+        n_features=model.n_features_in_
+    )
+
+
+# --- EXPORT / LOAD ---
+
+def export(model, out_dir=COMPRESSED_MODEL_DIR, max_depth=MAX_DEPTH, leaf_tolerance=LEAF_TOLERANCE,
+           source_version=None):
+    forest = compress_forest(model, max_depth, leaf_tolerance)
+    staging = f"{out_dir.rstrip(os.sep)}.staging-{uuid.uuid4().hex[:6]}"
+    os.makedirs(staging)
+    try:
+        for name in ARRAYS:
+            np.save(os.path.join(staging, f"{name}.npy"), getattr(forest, name), allow_pickle=False)
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump({
+                "max_depth": forest.max_depth,
+                "n_features": forest.n_features,
+                "n_trees": forest.n_trees,
+                "n_nodes": forest.n_nodes,
+                "source_version": source_version,
+                "source_fingerprint": model_fingerprint(model),
+                "pruning": {"max_depth": max_depth, "leaf_tolerance": leaf_tolerance}
+            }, f, indent=2)
+        # Swap the whole directory so readers never see a half-written export
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.rename(staging, out_dir)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return forest
+
+
+def load_meta(path=COMPRESSED_MODEL_DIR):
+    with open(os.path.join(path, "meta.json")) as f:
+        return json.load(f)
+
+
+def load(path=COMPRESSED_MODEL_DIR, mmap=True):
+    meta = load_meta(path)
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+        for name in ARRAYS
+    }
+    return CompiledForest(max_depth=meta["max_depth"], n_features=meta["n_features"], **arrays)
+
+
+def load_for(model, path=COMPRESSED_MODEL_DIR):
+    # The export at path if it was made from exactly this model, else None
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        return None
+    if load_meta(path)["source_fingerprint"] != model_fingerprint(model):
+        return None
+    return load(path)
+
+
+# --- REPORT ---
+
+def accuracy_report(model, forest, X, y=None):
+    X = np.asarray(X, dtype=np.float32)
+    names = getattr(model, "feature_names_in_", None)
+    original = model.predict(pd.DataFrame(X, columns=names) if names is not None else X)
+    compressed = forest.predict(X)
+    delta = np.abs(compressed - original)
+    report = {
+        "rows": len(X),
+        "mean_abs_delta": float(delta.mean()),
+        "max_abs_delta": float(delta.max()),
+        "identical_rows": float(np.mean(delta == 0))
+    }
+    if y is not None:
+        y = np.asarray(y, dtype=np.float64)
+        report["original_mae"] = float(np.mean(np.abs(original - y)))
+        report["compressed_mae"] = float(np.mean(np.abs(compressed - y)))
+    return report
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import feature_store
+    from model_registry import load_current
+    from preprocessing import FEATURE_ORDER, FeatureEncoder
+    from trainmodel import DATA_PATH, ENCODER_PATH, MODEL_PATH, REGISTRY_NAME, TARGET_COLUMN
+
+    parser = argparse.ArgumentParser(description="Export a compact, memory-mappable copy of the credit model")
+    parser.add_argument("--out", default=COMPRESSED_MODEL_DIR)
+    parser.add_argument("--max-depth", type=int, default=MAX_DEPTH)
+    parser.add_argument("--leaf-tolerance", type=float, default=LEAF_TOLERANCE)
+    args = parser.parse_args()
+
+    snapshot = load_current(REGISTRY_NAME, legacy={"model": MODEL_PATH, "label_encoders": ENCODER_PATH})
+    model = snapshot["model"]
+    forest = export(model, args.out, args.max_depth, args.leaf_tolerance, source_version=snapshot.version)
+
+    df = feature_store.load_frame(columns=FEATURE_ORDER + [TARGET_COLUMN], data_path=DATA_PATH)
+    df = df[df[TARGET_COLUMN].notna()]
+    X = FeatureEncoder(snapshot["label_encoders"], stringify=True).encode_columns(df)
+    report = accuracy_report(model, forest, X, df[TARGET_COLUMN])
+
+    original_nodes = sum(e.tree_.node_count for e in model.estimators_)
+    print(f"✅ Exported model {snapshot.version} to {args.out}/")
+    print(f"   nodes: {original_nodes} -> {forest.n_nodes} | max depth: "
+          f"{max(e.tree_.max_depth for e in model.estimators_)} -> {forest.max_depth}")
+    if os.path.exists(MODEL_PATH):
+        print(f"   size: {os.path.getsize(MODEL_PATH) / 1024:.0f} KB pickle -> {_dir_size(args.out) / 1024:.0f} KB")
+    print(f"📏 Accuracy delta on {report['rows']} rows: mean |Δ| {report['mean_abs_delta']:.4f}, "
+          f"max |Δ| {report['max_abs_delta']:.4f}, identical {report['identical_rows']:.1%}")
+    print(f"   MAE vs credit_score: original {report['original_mae']:.3f}, compressed {report['compressed_mae']:.3f}")
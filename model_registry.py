@@ -0,0 +1,286 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import joblib
+
+# Layout:
+#   model_registry/<name>/<version>/<artifact>.pkl + manifest.json   (immutable)
+#   model_registry/<name>/CURRENT                                    (pointer, replaced atomically)
+REGISTRY_DIR = os.environ.get(
+    "MODEL_REGISTRY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_registry")
+)
+POLL_INTERVAL = float(os.environ.get("MODEL_REGISTRY_POLL_INTERVAL", 5.0))
+# Versions kept per model after each publish (0 keeps everything)
+KEEP_VERSIONS = int(os.environ.get("MODEL_REGISTRY_KEEP_VERSIONS", 10))
+LEGACY_VERSION = "legacy"
+VERSION_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+def _name_dir(name, registry_dir=None):
+    return os.path.join(registry_dir or REGISTRY_DIR, name)
+
+
+def _atomic_write_text(path, text):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def atomic_dump(obj, path):
+    # joblib.dump to a temp file in the same directory, then rename over the target
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# --- WRITE SIDE ---
+
+def publish(name, artifacts: dict, metadata=None, registry_dir=None, make_current=True, keep=KEEP_VERSIONS):
+    name_dir = _name_dir(name, registry_dir)
+    os.makedirs(name_dir, exist_ok=True)
+
+    version = datetime.now().strftime(VERSION_TIME_FORMAT) + "-" + uuid.uuid4().hex[:6]
+    staging_dir = os.path.join(name_dir, f".staging-{version}")
+    os.makedirs(staging_dir)
+
+    manifest = {
+        "name": name,
+        "version": version,
+        "created_at": time.time(),
+        "artifacts": {},
+        "metadata": metadata or {}
+    }
+    try:
+        for key, obj in artifacts.items():
+            filename = f"{key}.pkl"
+            joblib.dump(obj, os.path.join(staging_dir, filename))
+            manifest["artifacts"][key] = filename
+        with open(os.path.join(staging_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+        # The version only becomes visible once it is complete
+        os.rename(staging_dir, os.path.join(name_dir, version))
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    if make_current:
+        set_current(name, version, registry_dir)
+    if keep:
+        prune(name, keep, registry_dir)
+    return version
+
+
+def set_current(name, version, registry_dir=None):
+    name_dir = _name_dir(name, registry_dir)
+    if not os.path.exists(os.path.join(name_dir, version, "manifest.json")):
+        raise FileNotFoundError(f"Unknown version '{version}' for model '{name}'")
+    _atomic_write_text(os.path.join(name_dir, "CURRENT"), version)
+
+
+def prune(name, keep=5, registry_dir=None):
+    # Removes the oldest versions, never the current one
+    current = current_version(name, registry_dir)
+    old = [v for v in list_versions(name, registry_dir)[:-keep] if v != current] if keep else []
+    for version in old:
+        shutil.rmtree(os.path.join(_name_dir(name, registry_dir), version), ignore_errors=True)
+    return old
+
+
+# --- READ SIDE ---
+
+def _version_key(version):
+    # Oldest first by the publish time in the name; names that don't parse sort first
+    try:
+        return (1, datetime.strptime(version.split("-", 1)[0], VERSION_TIME_FORMAT), version)
+    except ValueError:
+        return (0, datetime.min, version)
+
+
+def list_versions(name, registry_dir=None):
+    name_dir = _name_dir(name, registry_dir)
+    if not os.path.isdir(name_dir):
+        return []
+    return sorted(
+        (v for v in os.listdir(name_dir)
+         if not v.startswith(".") and os.path.exists(os.path.join(name_dir, v, "manifest.json"))),
+        key=_version_key
+    )
+
+
+def current_version(name, registry_dir=None):
+    try:
+        with open(os.path.join(_name_dir(name, registry_dir), "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_manifest(name, version, registry_dir=None):
+    with open(os.path.join(_name_dir(name, registry_dir), version, "manifest.json")) as f:
+        return json.load(f)
+
+
+def load_version(name, version, registry_dir=None):
+    manifest = load_manifest(name, version, registry_dir)
+    version_dir = os.path.join(_name_dir(name, registry_dir), version)
+    artifacts = {
+        key: joblib.load(os.path.join(version_dir, filename))
+        for key, filename in manifest["artifacts"].items()
+    }
+    return ModelSnapshot(version, artifacts, manifest)
+
+
+def load_current(name, legacy=None, registry_dir=None):
+    # legacy: {artifact: path} used when nothing has been published yet
+    version = current_version(name, registry_dir)
+    if version is not None:
+        return load_version(name, version, registry_dir)
+    if legacy is None:
+        raise FileNotFoundError(f"No published version of model '{name}' in {registry_dir or REGISTRY_DIR}")
+    artifacts = {key: joblib.load(path) for key, path in legacy.items()}
+    return ModelSnapshot(LEGACY_VERSION, artifacts, {"name": name, "version": LEGACY_VERSION})
+
+
+class ModelSnapshot:
+    # One immutable loaded version. `derived` holds per-version objects built by
+    # LiveModel preparers (compiled encoders, explainers, ...).
+
+    def __init__(self, version, artifacts, manifest):
+        self.version = version
+        self.artifacts = artifacts
+        self.manifest = manifest
+        self.derived = {}
+
+    def __getitem__(self, key):
+        # Bundled artifacts (credit_pipeline.CreditPipeline) also expose their parts
+        if key not in self.artifacts and "pipeline" in self.artifacts:
+            return getattr(self.artifacts["pipeline"], key)
+        return self.artifacts[key]
+
+
+# --- HOT SWAP ---
+
+class LiveModel:
+    # Serves the current version of a model and swaps to newer versions from a
+    # background thread. Requests call get() once and use that snapshot throughout,
+    # so in-flight work is never mixed across versions.
+
+    def __init__(self, name, legacy=None, poll_interval=POLL_INTERVAL, registry_dir=None):
+        self.name = name
+        self.legacy = legacy
+        self.poll_interval = poll_interval
+        self.registry_dir = registry_dir
+        self._lock = threading.Lock()
+        self._preparers = {}
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot = load_current(name, legacy, registry_dir)
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def get(self):
+        return self._snapshot
+
+    def add_preparer(self, key, fn):
+        # fn(snapshot) runs for the current version now and for every new version
+        # before it goes live, so derived objects are never built on the request path
+        with self._lock:
+            self._preparers[key] = fn
+            snapshot = self._snapshot
+            if key not in snapshot.derived:
+                snapshot.derived[key] = fn(snapshot)
+
+    def on_swap(self, callback):
+        self._listeners.append(callback)
+
+    def refresh(self):
+        version = current_version(self.name, self.registry_dir)
+        if version is None or version == self._snapshot.version:
+            return False
+        with self._lock:
+            if version == self._snapshot.version:
+                return False
+            snapshot = load_version(self.name, version, self.registry_dir)
+            for key, fn in self._preparers.items():
+                snapshot.derived[key] = fn(snapshot)
+            previous, self._snapshot = self._snapshot, snapshot
+        print(f"🔄 Model '{self.name}' swapped: {previous.version} -> {snapshot.version}")
+        for callback in self._listeners:
+            callback(previous, snapshot)
+        return True
+
+    def start(self):
+        if self._thread is not None or self.poll_interval <= 0:
+            return self
+        self._thread = threading.Thread(target=self._watch, name=f"model-watch-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _after_fork(self):
+        # The watcher thread (and any lock it held) did not survive fork()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if self._thread is not None:
+            self._thread = None
+            self.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the current version if the new one can't be loaded
+                print(f"⚠️ Model '{self.name}' refresh failed: {e}")
+
+
+_live_models = {}
+_live_models_lock = threading.Lock()
+
+
+def get_live_model(name, legacy=None, poll_interval=POLL_INTERVAL, registry_dir=None):
+    # One LiveModel per name per process, shared by every module that serves it
+    with _live_models_lock:
+        live = _live_models.get(name)
+        if live is None:
+            live = LiveModel(name, legacy, poll_interval, registry_dir).start()
+            _live_models[name] = live
+        return live
+
+
+def live_models():
+    # LiveModels loaded in this process so far
+    with _live_models_lock:
+        return list(_live_models.values())
+
+
+def _reinit_after_fork():
+    # Preloading servers (gunicorn preload_app) fork workers after the models are
+    # loaded; each worker keeps the parent's snapshots (shared copy-on-write pages)
+    # and restarts its own version watcher
+    global _live_models_lock
+    _live_models_lock = threading.Lock()
+    for live in _live_models.values():
+        live._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
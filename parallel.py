@@ -0,0 +1,23 @@
+from collections import deque
+from multiprocessing import Pool
+
+# Order-preserving process map with bounded memory, shared by the chunked CLIs
+# (bulk_score.py, datageneration.py). Unlike Pool.imap, which keeps pulling tasks and
+# buffering results, at most max_pending_per_job tasks per worker are in flight.
+MAX_PENDING_PER_JOB = 2
+
+
+def ordered_map(fn, tasks, n_jobs, max_pending_per_job=MAX_PENDING_PER_JOB):
+    # Yields fn(task) in task order; tasks may be a lazy iterator
+    if n_jobs <= 1:
+        for task in tasks:
+            yield fn(task)
+        return
+    with Pool(n_jobs) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.apply_async(fn, (task,)))
+            if len(pending) >= n_jobs * max_pending_per_job:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Memoizes scores, suggestions and SHAP values for repeated applicants.
+#
+# Keys are a hash of (namespace, model name, model version, canonical feature
+# vector), so two requests that preprocess to the same vector share an entry and a
+# new model version never sees old results. Entries of the outgoing version are
+# dropped when its LiveModel swaps. The in-memory LRU can be backed by a SQLite file
+# (PREDICTION_CACHE_DIR) that survives restarts and is shared by worker processes.
+CACHE_ENABLED = os.environ.get("PREDICTION_CACHE", "1") == "1"
+MAX_ENTRIES = int(os.environ.get("PREDICTION_CACHE_SIZE", 10000))
+TTL_SECONDS = float(os.environ.get("PREDICTION_CACHE_TTL", 3600))
+CACHE_DIR = os.environ.get("PREDICTION_CACHE_DIR") or None
+
+
+def canonical_bytes(vector):
+    # Numeric vectors as float64 bytes (so 1, 1.0 and np.int64(1) agree); anything
+    # else (raw categorical values) as JSON
+    try:
+        return np.asarray(vector, dtype=np.float64).tobytes()
+    except (TypeError, ValueError):
+        return json.dumps([v.item() if isinstance(v, np.generic) else v for v in vector], default=str).encode()
+
+
+class _DiskStore:
+    # SQLite table key -> (model, version, expires, pickled value); one connection per process
+
+    def __init__(self, cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "predictions.sqlite")
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS predictions "
+                         "(key TEXT PRIMARY KEY, model TEXT, version TEXT, expires REAL, value BLOB)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        # -> (model, version, expires, value) or None
+        row = self._conn().execute("SELECT model, version, expires, value FROM predictions WHERE key = ?",
+                                   (key,)).fetchone()
+        if row is None or row[2] < time.time():
+            return None
+        return row[0], row[1], row[2], pickle.loads(row[3])
+
+    def put(self, key, model, version, expires, value):
+        self._conn().execute("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                             (key, model, version, expires, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def invalidate(self, model, version):
+        self._conn().execute("DELETE FROM predictions WHERE model = ? AND version = ?", (model, version))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM predictions")
+
+
+class PredictionCache:
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, cache_dir=CACHE_DIR):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk = _DiskStore(cache_dir) if cache_dir else None
+        self._entries = OrderedDict()  # key -> (model, version, expires, value)
+        self._lock = threading.Lock()
+        self._attached = set()
+        self.hits = {}
+        self.misses = {}
+
+    def key(self, namespace, model, version, vector):
+        digest = hashlib.sha256(f"{namespace}\0{model}\0{version}\0".encode())
+        digest.update(canonical_bytes(vector))
+        return digest.hexdigest()
+
+    def attach(self, live_model):
+        # Drop the outgoing version's entries whenever this model swaps
+        with self._lock:
+            if live_model.name in self._attached:
+                return
+            self._attached.add(live_model.name)
+        live_model.on_swap(lambda previous, snapshot: self.invalidate(live_model.name, previous.version))
+
+    def _count(self, counter, namespace):
+        counter[namespace] = counter.get(namespace, 0) + 1
+
+    def get(self, key, namespace=""):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] >= now:
+                self._entries.move_to_end(key)
+                self._count(self.hits, namespace)
+                return entry[3]
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry
+                    if len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                    self._count(self.hits, namespace)
+                return entry[3]
+        with self._lock:
+            self._count(self.misses, namespace)
+        return None
+
+    def put(self, key, model, version, value):
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._entries[key] = (model, version, expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.disk is not None:
+            self.disk.put(key, model, version, expires, value)
+
+    def get_or_compute(self, namespace, live_model, snapshot, vector, compute):
+        # compute() runs on a miss; results must be picklable for the disk backend
+        self.attach(live_model)
+        key = self.key(namespace, live_model.name, snapshot.version, vector)
+        value = self.get(key, namespace)
+        if value is None:
+            value = compute()
+            self.put(key, live_model.name, snapshot.version, value)
+        return value
+
+    def invalidate(self, model, version):
+        with self._lock:
+            stale = [k for k, entry in self._entries.items() if entry[0] == model and entry[1] == version]
+            for k in stale:
+                del self._entries[k]
+        if self.disk is not None:
+            self.disk.invalidate(model, version)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def metrics(self):
+        with self._lock:
+            namespaces = sorted(set(self.hits) | set(self.misses))
+            per_namespace = {}
+            for ns in namespaces:
+                hits, misses = self.hits.get(ns, 0), self.misses.get(ns, 0)
+                per_namespace[ns] = {"hits": hits, "misses": misses,
+                                     "hit_rate": hits / (hits + misses) if hits + misses else 0.0}
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "disk": self.disk.path if self.disk is not None else None,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "namespaces": per_namespace
+            }
@@ -0,0 +1,99 @@
+import numpy as np
+
+import instrumentation
+
+FEATURE_ORDER = [
+    "age",
+    "num_occupants",
+    "cash_inflow",
+    "avg_bank_balance",
+    "bill_payment_consistency",
+    "bnpl_used",
+    "bnpl ratio",
+    "rent_amount",
+    "location_type",
+    "education_level",
+    "income_type",
+    "grade_or_cgpa",
+    "housing_type",
+    "age_to_employment_ratio"
+]
+
+
+def _bool_to_str(value):
+    # np.bool_ included: pandas hands numpy bools to .apply as Python bools
+    return str(bool(value)) if isinstance(value, (bool, np.bool_)) else value
+
+
+class FeatureEncoder:
+    # Precompiled replacement for the DataFrame/.apply/LabelEncoder.transform path.
+    #
+    # Each fitted LabelEncoder becomes a plain dict {class: code}; unknown values
+    # fall back to code 0.0, which is what mapping them to classes_[0] produced.
+    # stringify=False matches main.py (only bools become strings), stringify=True
+    # matches explanation.py / update_model.py (every value goes through str()).
+    #
+    # With instrumentation on, lookups miss to NaN instead; encode()/encode_columns()
+    # count those per column (credit_unknown_category_total) and then write the 0.0.
+
+    def __init__(self, label_encoders, feature_order=FEATURE_ORDER, stringify=False, model=""):
+        self.feature_order = list(feature_order)
+        self.key = str if stringify else _bool_to_str
+        self.model = model
+        self.tables = {
+            col: {cls: float(code) for code, cls in enumerate(le.classes_)}
+            for col, le in label_encoders.items()
+        }
+        # (column, lookup table or None for numeric columns) in output order
+        self.columns = [(col, self.tables.get(col)) for col in self.feature_order]
+        self.count_unknown = instrumentation.INSTRUMENTATION
+        self.missing = np.nan if self.count_unknown else 0.0
+        self.categorical_index = [j for j, (_, table) in enumerate(self.columns) if table is not None]
+
+    def _record_unknown(self, out):
+        block = out[:, self.categorical_index]
+        unknown = np.isnan(block)
+        if unknown.any():
+            for j, n in zip(self.categorical_index, unknown.sum(axis=0)):
+                if n:
+                    instrumentation.count_unknown(self.columns[j][0], int(n), self.model)
+            block[unknown] = 0.0
+            out[:, self.categorical_index] = block
+        return out
+
+    def encode_value(self, col, value):
+        table = self.tables.get(col)
+        if table is None:
+            return value
+        code = table.get(self.key(value))
+        if code is None:
+            instrumentation.count_unknown(col, 1, self.model)
+            return 0.0
+        return code
+
+    def encode(self, records):
+        # dict or list of dicts -> contiguous float64 array in feature_order
+        if isinstance(records, dict):
+            records = [records]
+        key, missing = self.key, self.missing
+        out = np.empty((len(records), len(self.columns)), dtype=np.float64)
+        for i, record in enumerate(records):
+            out[i] = [
+                record[col] if table is None else table.get(key(record[col]), missing)
+                for col, table in self.columns
+            ]
+        return self._record_unknown(out) if self.count_unknown else out
+
+    def encode_columns(self, columns):
+        # Column-oriented input (a DataFrame or a dict of sequences)
+        key, missing = self.key, self.missing
+        n_rows = len(columns[self.feature_order[0]])
+        out = np.empty((n_rows, len(self.columns)), dtype=np.float64)
+        for j, (col, table) in enumerate(self.columns):
+            values = columns[col]
+            values = values.to_numpy(dtype=object) if hasattr(values, "to_numpy") else values
+            if table is None:
+                out[:, j] = values
+            else:
+                out[:, j] = np.fromiter((table.get(key(v), missing) for v in values), dtype=np.float64, count=n_rows)
+        return self._record_unknown(out) if self.count_unknown else out
@@ -0,0 +1,161 @@
+import numpy as np
+
+# Vectorized rule-based credit score.
+#
+# RULES holds one declarative table per existing scalar implementation:
+#   "creditcalculator" -> creditcalculator.calculate_credit_score
+#       (string bill payment labels, raw ratios, Graduate/Postgraduate education rule)
+#   "datageneration"   -> datageneration.calculate_credit_score
+#       (numeric bill payment, ratios guarded with max(x, 1), PhD/PostGraduate rule)
+# score_batch() evaluates a whole column-oriented batch with np.select/np.where and
+# adds the components in the same order as the scalar code, so results match it
+# exactly. One difference: a zero denominator gives inf/nan here instead of raising
+# ZeroDivisionError in creditcalculator.
+
+WEIGHTS = {
+    "income_to_rent": 150,
+    "bill_payment": 150,
+    "bnpl_usage": 100,
+    "bank_balance_ratio": 100,
+    "education": 50,
+    "age_employment_ratio": 50,
+    "location_housing": 50,
+    "num_occupants": 50,
+    "income_type": 100
+}
+
+BILL_PAYMENT_FACTORS = {"Always": 1.0, "Usually": 0.7, "Sometimes": 0.4, "Rarely": 0.2, "Never": 0.0}
+
+# Tiers are checked in order: first (threshold, factor) whose comparison holds wins
+_SHARED_RULES = {
+    "bnpl_usage": {"not_used": 1.0, "op": "<", "tiers": [(0.5, 0.6), (0.8, 0.4)], "default": 0.2},
+    "bank_balance_ratio": {"op": ">=", "tiers": [(0.1, 1.0), (0.05, 0.7)], "default": 0.4},
+    "age_employment_ratio": {"op": ">=", "tiers": [(0.6, 1.0), (0.4, 0.7)], "default": 0.4},
+    "location_housing": {"both": 1.0, "either": 0.7, "neither": 0.4},
+    "num_occupants": {"op": "<=", "tiers": [(2, 1.0), (4, 0.75)], "default": 0.5},
+    "income_type": {"salaried": 1.0, "other": 0.6}
+}
+
+RULES = {
+    "creditcalculator": dict(
+        _SHARED_RULES,
+        weights=WEIGHTS,
+        denominator_floor=None,
+        income_to_rent={"op": ">=", "tiers": [(4, 1.0), (2, 0.75)], "default": 0.5},
+        bill_payment={"labels": BILL_PAYMENT_FACTORS, "default": 0.5},
+        education={
+            "cgpa_levels": ["Postgraduate", "Graduate"],
+            "cgpa": {"op": ">=", "tiers": [(8, 1.0), (6, 0.75)], "default": 0.5},
+            "flat_levels": [],
+            "flat": 0.75,
+            "default": 0.5
+        }
+    ),
+    "datageneration": dict(
+        _SHARED_RULES,
+        weights=WEIGHTS,
+        denominator_floor=1,
+        income_to_rent={"op": ">=", "tiers": [(4, 1.0), (2, 0.75)], "default": 0.5},
+        bill_payment={"labels": None, "default": None},
+        education={
+            "cgpa_levels": ["PostGraduate", "PhD"],
+            "cgpa": {"op": ">=", "tiers": [(8, 1.0), (6, 0.75)], "default": 0.5},
+            "flat_levels": ["Graduate", "Diploma"],
+            "flat": 0.75,
+            "default": 0.5
+        }
+    )
+}
+
+_OPS = {">=": np.greater_equal, "<=": np.less_equal, "<": np.less}
+
+
+def _tiered(values, rule):
+    compare = _OPS[rule["op"]]
+    return np.select(
+        [compare(values, threshold) for threshold, _ in rule["tiers"]],
+        [factor for _, factor in rule["tiers"]],
+        default=rule["default"]
+    )
+
+
+def _column(columns, name, dtype=None):
+    values = columns[name]
+    values = values.to_numpy() if hasattr(values, "to_numpy") else np.asarray(values)
+    return values.astype(dtype) if dtype is not None else values
+
+
+def _ratio(numerator, denominator, floor):
+    if floor is not None:
+        denominator = np.maximum(denominator, floor)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerator / denominator
+
+
+def component_factors(columns, variant="datageneration"):
+    # -> {component: factor array in [0, 1]}, in scoring order
+    rules = RULES[variant]
+    floor = rules["denominator_floor"]
+    cash_inflow = _column(columns, "cash_inflow", np.float64)
+
+    factors = {}
+    factors["income_to_rent"] = _tiered(
+        _ratio(cash_inflow, _column(columns, "rent_amount", np.float64), floor), rules["income_to_rent"]
+    )
+
+    bill = rules["bill_payment"]
+    if bill["labels"] is None:
+        factors["bill_payment"] = _column(columns, "bill_payment_consistency", np.float64)
+    else:
+        labels = _column(columns, "bill_payment_consistency")
+        factors["bill_payment"] = np.fromiter(
+            (bill["labels"].get(label, bill["default"]) for label in labels), dtype=np.float64, count=len(labels)
+        )
+
+    bnpl = rules["bnpl_usage"]
+    used = _column(columns, "bnpl_used").astype(bool)
+    factors["bnpl_usage"] = np.where(used, _tiered(_column(columns, "bnpl ratio", np.float64), bnpl), bnpl["not_used"])
+
+    factors["bank_balance_ratio"] = _tiered(
+        _ratio(_column(columns, "avg_bank_balance", np.float64), cash_inflow, floor), rules["bank_balance_ratio"]
+    )
+
+    education = rules["education"]
+    level = _column(columns, "education_level")
+    factors["education"] = np.select(
+        [np.isin(level, education["cgpa_levels"]), np.isin(level, education["flat_levels"])],
+        [_tiered(_column(columns, "grade_or_cgpa", np.float64), education["cgpa"]), education["flat"]],
+        default=education["default"]
+    )
+
+    factors["age_employment_ratio"] = _tiered(
+        _column(columns, "age_to_employment_ratio", np.float64), rules["age_employment_ratio"]
+    )
+
+    location = rules["location_housing"]
+    urban = _column(columns, "location_type") == "Urban"
+    owned = _column(columns, "housing_type") == "Owned"
+    factors["location_housing"] = np.select(
+        [urban & owned, urban | owned], [location["both"], location["either"]], default=location["neither"]
+    )
+
+    factors["num_occupants"] = _tiered(_column(columns, "num_occupants", np.float64), rules["num_occupants"])
+
+    income = rules["income_type"]
+    factors["income_type"] = np.where(_column(columns, "income_type") == "Salaried", income["salaried"], income["other"])
+    return factors
+
+
+def score_batch(columns, variant="datageneration"):
+    # columns: DataFrame or dict of equal-length sequences -> float64 scores rounded to 2dp
+    weights = RULES[variant]["weights"]
+    factors = component_factors(columns, variant)
+    score = np.zeros(len(factors["income_type"]), dtype=np.float64)
+    for name, factor in factors.items():
+        score += weights[name] * factor
+    return np.round(score, 2)
+
+
+def loan_decisions(scores):
+    # Same thresholds as datageneration.loan_decision
+    return np.select([scores >= 700, scores >= 600], ["Approved", "Review"], default="Rejected")
@@ -0,0 +1,22 @@
+from drift_monitor import DriftMonitor
+
+BASELINE = {"age": [20, 25, 30, 35, 40] * 20, "location_type": ["Urban", "Rural"] * 50}
+
+
+def monitor(min_observations):
+    return DriftMonitor(BASELINE, ["age"], ["location_type"], aliases={}, min_observations=min_observations)
+
+
+def test_report_with_zero_min_observations_skips_unseen_features():
+    drift = monitor(0)
+    drift.observe({"age": 30})
+    report = drift.report()
+    assert report["features"]["location_type"]["psi"] is None
+    assert "location_type" not in report["drifted"]
+    assert report["min_observations"] == 1
+
+
+def test_report_flags_shifted_feature():
+    drift = monitor(10)
+    drift.observe_many([{"age": 90, "location_type": "Urban"}, {"age": 90, "location_type": "Rural"}] * 5)
+    assert drift.report()["drifted"] == ["age"]
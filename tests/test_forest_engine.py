@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from forest_engine import BATCH_ROWS, compile_forest
+
+N_FEATURES = 14
+
+
+def _data(n_rows, seed=0, missing=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, N_FEATURES))
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) * 10 + X[:, 2] * X[:, 3] + rng.normal(size=n_rows)
+    if missing:
+        X[rng.random(X.shape) < missing] = np.nan
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def model():
+    X, y = _data(500)
+    return RandomForestRegressor(n_estimators=25, random_state=42).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def model_with_missing():
+    X, y = _data(500, missing=0.1)
+    return RandomForestRegressor(n_estimators=25, max_depth=8, random_state=42).fit(X, y)
+
+
+@pytest.mark.parametrize("n_rows", [1, BATCH_ROWS - 1, BATCH_ROWS, 1000])
+def test_predict_matches_sklearn(model, n_rows):
+    # Fewer than BATCH_ROWS rows walk all trees together, more use per-tree apply()
+    X, _ = _data(n_rows, seed=1)
+    assert np.array_equal(compile_forest(model).predict(X), model.predict(X))
+
+
+def test_walk_path_on_large_batch(model):
+    # Without the sklearn trees (e.g. a compressed export) every batch size walks
+    X, _ = _data(1000, seed=2)
+    engine = compile_forest(model)
+    engine.trees = None
+    assert np.array_equal(engine.predict(X), model.predict(X))
+
+
+@pytest.mark.parametrize("n_rows", [BATCH_ROWS - 1, 1000])
+def test_missing_values_follow_sklearn(model_with_missing, n_rows):
+    X, _ = _data(n_rows, seed=3, missing=0.1)
+    expected = model_with_missing.predict(X)
+    engine = compile_forest(model_with_missing)
+    assert np.array_equal(engine.predict(X), expected)
+    engine.trees = None
+    assert np.array_equal(engine.predict(X), expected)
+
+
+def test_leaves_match_sklearn_apply(model):
+    X, _ = _data(100, seed=4)
+    engine = compile_forest(model)
+    expected = model.apply(X.astype(np.float32)).T + engine.roots[:, None]
+    assert np.array_equal(engine.leaves(X), expected)
+    assert np.array_equal(engine.apply(X), expected)
+
+
+def test_rejects_wrong_width(model):
+    with pytest.raises(ValueError):
+        compile_forest(model).predict(np.zeros((2, N_FEATURES - 1)))
@@ -0,0 +1,38 @@
+import pytest
+
+from input_schema import InputSchema, bill_payment_field, number_field
+
+SCHEMA = InputSchema([number_field("age"), bill_payment_field("bill_payment_consistency", "number")])
+ROW = {"age": 30, "bill_payment_consistency": "Usually"}
+
+NOT_NUMERIC = [10 ** 400, -10 ** 400, "1e400", "inf", "-Infinity", "nan", float("inf"), float("nan"), "abc", None, True]
+
+
+@pytest.mark.parametrize("value", NOT_NUMERIC)
+def test_non_numeric_or_non_finite_is_rejected(value):
+    row, error = SCHEMA.validate({**ROW, "age": value})
+    assert row is None
+    assert error == "Field 'age' must be numeric"
+
+
+@pytest.mark.parametrize("value", [10 ** 400, "1e400", "nan"])
+def test_non_finite_bill_payment_score_is_rejected(value):
+    row, error = SCHEMA.validate({**ROW, "bill_payment_consistency": value})
+    assert row is None
+    assert "bill_payment_consistency" in error
+
+
+@pytest.mark.parametrize("value, expected", [(30, 30.0), (30.5, 30.5), ("30", 30.0), (" 42 ", 42.0)])
+def test_numbers_are_coerced(value, expected):
+    row, error = SCHEMA.validate({**ROW, "age": value})
+    assert error is None
+    assert row["age"] == expected
+
+
+def test_predict_rejects_huge_integer():
+    from app import app
+    from main import sample_users
+
+    response = app.test_client().post("/predict", json={**sample_users[0], "age": 10 ** 400})
+    assert response.status_code == 400
+    assert "must be numeric" in response.get_json()["error"]
@@ -0,0 +1,96 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import creditcalculator
+import datageneration
+from rule_engine import score_batch
+
+SCALAR = {
+    "creditcalculator": creditcalculator.calculate_credit_score,
+    "datageneration": datageneration.calculate_credit_score
+}
+
+BASE = {
+    "age": 30, "num_occupants": 3, "cash_inflow": 40000.0, "avg_bank_balance": 3000.0,
+    "bill_payment_consistency": 0.7, "bnpl_used": True, "bnpl ratio": 0.6, "rent_amount": 15000.0,
+    "location_type": "Urban", "education_level": "Graduate", "income_type": "Salaried",
+    "grade_or_cgpa": 7.0, "housing_type": "Rented", "age_to_employment_ratio": 0.5
+}
+
+# Values on, just below and just above every rule threshold (one field varied at a time)
+EPS = 1e-9
+BOUNDARIES = {
+    "rent_amount": [10000.0, 10000.0 + EPS, 20000.0, 20000.0 - EPS, 20000.0 + EPS, 39999.0],  # income/rent 4 and 2
+    "avg_bank_balance": [4000.0, 4000.0 - EPS, 2000.0, 2000.0 - EPS, 0.0],                  # balance/income 0.1, 0.05
+    "bnpl ratio": [0.5, 0.5 - EPS, 0.8, 0.8 - EPS, 0.0, 1.0],
+    "bnpl_used": [True, False],
+    "grade_or_cgpa": [8.0, 8.0 - EPS, 6.0, 6.0 - EPS, 10.0],
+    "age_to_employment_ratio": [0.6, 0.6 - EPS, 0.4, 0.4 - EPS],
+    "num_occupants": [1, 2, 3, 4, 5],
+    "location_type": ["Urban", "Rural", "Semi-Urban"],
+    "housing_type": ["Owned", "Rented", "Pg"],
+    "income_type": ["Salaried", "Gig", "Informal"],
+    "education_level": ["12th", "Diploma", "Graduate", "Postgraduate", "PostGraduate", "PhD"]
+}
+BILL_VALUES = {
+    "creditcalculator": ["Always", "Usually", "Sometimes", "Rarely", "Never", "Unknown"],
+    "datageneration": [0.0, 0.2, 0.4, 0.7, 1.0]
+}
+# datageneration guards its ratios with max(x, 1); creditcalculator divides by zero
+ZERO_DENOMINATORS = {"rent_amount": [0.0, 0.5], "cash_inflow": [0.0, 0.5]}
+
+
+def boundary_records(variant):
+    records = []
+    values = dict(BOUNDARIES, bill_payment_consistency=BILL_VALUES[variant])
+    if variant == "datageneration":
+        values.update(ZERO_DENOMINATORS)
+    for field, options in values.items():
+        for value in options:
+            for location, housing in [("Urban", "Owned"), ("Rural", "Rented")]:
+                record = dict(BASE, location_type=location, housing_type=housing,
+                              bill_payment_consistency=values["bill_payment_consistency"][1])
+                record[field] = value
+                records.append(record)
+    return records
+
+
+def random_records(variant, n=5000, seed=0):
+    random.seed(seed)
+    records = []
+    for _ in range(n):
+        user = datageneration.generate_synthetic_user()
+        user.pop("credit_score", None)
+        user.pop("loan_decision", None)
+        if variant == "creditcalculator":
+            user["bill_payment_consistency"] = random.choice(BILL_VALUES["creditcalculator"])
+            user["education_level"] = random.choice(BOUNDARIES["education_level"])
+        records.append(user)
+    return records
+
+
+def _assert_parity(variant, records):
+    expected = np.array([SCALAR[variant](r) for r in records])
+    actual = score_batch(pd.DataFrame(records), variant)
+    mismatches = np.flatnonzero(expected != actual)
+    assert not len(mismatches), [(records[i], expected[i], actual[i]) for i in mismatches[:3]]
+
+
+@pytest.mark.parametrize("variant", list(SCALAR))
+def test_boundaries_match_scalar(variant):
+    _assert_parity(variant, boundary_records(variant))
+
+
+@pytest.mark.parametrize("variant", list(SCALAR))
+def test_random_rows_match_scalar(variant):
+    _assert_parity(variant, random_records(variant))
+
+
+@pytest.mark.parametrize("variant", list(SCALAR))
+def test_dict_of_columns(variant):
+    records = boundary_records(variant)
+    columns = {col: [r[col] for r in records] for col in records[0]}
+    assert np.array_equal(score_batch(columns, variant), score_batch(pd.DataFrame(records), variant))
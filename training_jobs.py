@@ -0,0 +1,219 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+DATA_PATH = "credit_score_database.csv"
+MODEL_PATH = "credit_model.pkl"
+ENCODER_PATH = "label_encoders.pkl"
+REGISTRY_NAME = "credit_model"
+
+# Jobs for different datasets may run side by side; each job fits on TRAINING_N_JOBS cores
+TRAINING_WORKERS = int(os.environ.get("TRAINING_WORKERS", 1))
+TRAINING_N_JOBS = int(os.environ.get("TRAINING_N_JOBS", -1))
+# "spawn" keeps the training process free of the server's threads and locks
+TRAINING_START_METHOD = os.environ.get("TRAINING_START_METHOD", "spawn")
+
+
+# --- CHILD PROCESS ---
+
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_job(job_id, data_path, incremental, n_jobs):
+    # Runs in the pool process; the new version is published to the model registry,
+    # which serving processes pick up on their own
+    import feature_store
+    from model_registry import load_current
+    from trainmodel import FEATURE_COLUMNS, TARGET_COLUMN, train_model, train_model_incremental
+
+    def progress(done, total):
+        if _progress_queue is not None:
+            _progress_queue.put((job_id, done, total))
+
+    df = feature_store.load_frame(columns=FEATURE_COLUMNS + [TARGET_COLUMN], data_path=data_path)
+    if not incremental:
+        return train_model(df, n_jobs, progress)
+    snapshot = load_current(REGISTRY_NAME, legacy={"model": MODEL_PATH, "label_encoders": ENCODER_PATH})
+    return train_model_incremental(df, snapshot["model"], snapshot["label_encoders"], n_jobs=n_jobs,
+                                   progress=progress)
+
+
+# --- RUNNER ---
+
+class TrainingJob:
+
+    def __init__(self, job_id, dataset, incremental, reason):
+        self.id = job_id
+        self.dataset = dataset
+        self.incremental = incremental
+        self.reason = reason
+        self.status = "queued"
+        self.progress = 0.0
+        self.started = None
+        self.finished = None
+        self.version = None
+        self.error = None
+        self._done = threading.Event()
+
+    @property
+    def wall_time(self):
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "dataset": self.dataset,
+            "incremental": self.incremental,
+            "reason": self.reason,
+            "status": self.status,
+            "progress": self.progress,
+            "wall_time": self.wall_time,
+            "version": self.version,
+            "error": self.error
+        }
+
+
+class TrainingJobRunner:
+    # submit() never blocks on training: fits run in a separate process pool. At most
+    # one job runs per dataset; requests that arrive while it runs are coalesced into
+    # a single follow-up job, which starts when the running one finishes.
+
+    def __init__(self, max_workers=TRAINING_WORKERS, n_jobs=TRAINING_N_JOBS, start_method=TRAINING_START_METHOD):
+        self.max_workers = max_workers
+        self.n_jobs = n_jobs
+        self._context = multiprocessing.get_context(start_method)
+        # Reentrant: a future that is already done runs _finish inside _start
+        self._lock = threading.RLock()
+        self._pool = None
+        self._progress_queue = None
+        self._running = {}
+        self._pending = {}
+        self._history = []
+        self._next_id = 1
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._progress_queue = self._context.Queue()
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=self._context,
+                                             initializer=_init_worker, initargs=(self._progress_queue,))
+            threading.Thread(target=self._watch_progress, args=(self._progress_queue,),
+                             name="training-progress", daemon=True).start()
+        return self._pool
+
+    def submit(self, dataset=DATA_PATH, incremental=True, reason="manual"):
+        # -> the TrainingJob that will cover this request (possibly an existing one)
+        dataset = os.path.abspath(dataset)
+        with self._lock:
+            pending = self._pending.get(dataset)
+            if pending is not None:
+                # A full retrain request upgrades a queued incremental one
+                pending.incremental = pending.incremental and incremental
+                return pending
+            job = TrainingJob(self._next_id, dataset, incremental, reason)
+            self._next_id += 1
+            self._history.append(job)
+            if dataset in self._running:
+                self._pending[dataset] = job
+                return job
+            self._start(job)
+            return job
+
+    def _start(self, job):
+        # Called with the lock held
+        job.status = "running"
+        job.started = time.time()
+        self._running[job.dataset] = job
+        print(f"🏋️ Training job {job.id} started ({job.reason})")
+        try:
+            future = self._ensure_pool().submit(_run_job, job.id, job.dataset, job.incremental, self.n_jobs)
+        except RuntimeError as e:
+            # Interpreter shutting down / pool closed
+            job.status, job.error, job.finished = "failed", str(e), time.time()
+            self._running.pop(job.dataset, None)
+            job._done.set()
+            return
+        future.add_done_callback(lambda f: self._finish(job, f))
+
+    def _finish(self, job, future):
+        try:
+            job.version = future.result()
+            job.status = "done"
+            job.progress = 1.0
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        job.finished = time.time()
+        if job.status == "done":
+            print(f"✅ Training job {job.id} finished in {job.wall_time:.1f}s (version {job.version})")
+        else:
+            print(f"❌ Training job {job.id} failed after {job.wall_time:.1f}s: {job.error}")
+        job._done.set()
+
+        with self._lock:
+            if isinstance(future.exception(), BrokenProcessPool):
+                # A worker died (e.g. OOM); the next job gets a fresh pool
+                self._pool = None
+            self._running.pop(job.dataset, None)
+            follow_up = self._pending.pop(job.dataset, None)
+            if follow_up is not None:
+                self._start(follow_up)
+
+    def _watch_progress(self, progress_queue):
+        while True:
+            try:
+                job_id, done, total = progress_queue.get()
+            except (EOFError, OSError):
+                return
+            # Jobs start and finish on other threads
+            with self._lock:
+                running = list(self._running.values())
+            for job in running:
+                if job.id == job_id:
+                    job.progress = done / total
+                    print(f"⏳ Training job {job_id}: {done}/{total} trees ({job.wall_time:.1f}s)")
+
+    def status(self, dataset=None):
+        with self._lock:
+            jobs = [j for j in self._history if dataset is None or j.dataset == os.path.abspath(dataset)]
+            return [j.to_dict() for j in jobs]
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_training_runner():
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = TrainingJobRunner()
+        return _runner
+
+
+if __name__ == "__main__":
+    data_path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    runner = TrainingJobRunner()
+    job = runner.submit(data_path, incremental=False, reason="command line")
+    job.wait()
+    runner.shutdown()
+    sys.exit(0 if job.status == "done" else 1)
@@ -1,19 +1,23 @@
+import copy
 import pandas as pd
-import joblib
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 import os
+from credit_pipeline import CreditPipeline
+from model_registry import atomic_dump, current_version, load_manifest, publish
+from feature_store import load_frame
 
 # File paths
 MODEL_PATH = 'credit_model.pkl'
 ENCODER_PATH = 'label_encoders.pkl'
 DATA_PATH = 'credit_score_database.csv'  # <- Your dataset path
+REGISTRY_NAME = 'credit_model'
 
 # Categorical columns to encode
 CATEGORICAL_COLUMNS = [
     'bnpl_used', 'location_type', 'education_level',
-    'income_type', 'housing_type', 'loan_decision'  # Included for compatibility
+    'income_type', 'housing_type'
 ]
 
 # Features to train on
@@ -26,7 +30,19 @@ FEATURE_COLUMNS = [
 
 TARGET_COLUMN = 'credit_score'
 
-def train_model(df: pd.DataFrame):
+# Estimator used until tune_model publishes a winner; afterwards every retrain rebuilds
+# the family + parameters recorded in the serving version's metadata
+DEFAULT_CONFIG = {"family": "random_forest", "params": {"n_estimators": 100}}
+
+# Incremental (warm start) retraining
+ADDED_ESTIMATORS = 20
+MAX_ESTIMATORS = 300
+
+# Trees are fitted on all cores by default; progress is reported after each stage
+TRAINING_N_JOBS = int(os.environ.get("TRAINING_N_JOBS", -1))
+PROGRESS_STAGES = 4
+
+def _encode_training_data(df: pd.DataFrame):
     df = df.copy()
 
     print("📊 Initial dataset shape:", df.shape)
@@ -48,7 +64,7 @@ def train_model(df: pd.DataFrame):
             le = LabelEncoder()
             df[col] = le.fit_transform(df[col])
             label_encoders[col] = le
-        else:
+        elif col in FEATURE_COLUMNS:
             print(f"⚠️ Warning: Column '{col}' not found in dataset.")
 
     # Ensure all required features exist
@@ -59,25 +75,269 @@ def train_model(df: pd.DataFrame):
     # Split features and target
     X = df[FEATURE_COLUMNS]
     y = df[TARGET_COLUMN]
+    return X, y, label_encoders, len(df)
+
+def _prepare_training_data(df: pd.DataFrame):
+    X, y, label_encoders, n_rows = _encode_training_data(df)
 
     # Train-test split
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return X_train, y_train, label_encoders, n_rows
 
-    # Train model
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+def _save_model(model, label_encoders, n_rows, metadata=None, config=None):
+    # Save model and encoders (written atomically so readers never see a partial pickle)
+    atomic_dump(model, MODEL_PATH)
+    atomic_dump(label_encoders, ENCODER_PATH)
 
-    # Save model and encoders
-    joblib.dump(model, MODEL_PATH)
-    joblib.dump(label_encoders, ENCODER_PATH)
+    # Publish schema + encoders + model as one immutable version; running servers
+    # hot-swap to it
+    metadata = {
+        "rows": n_rows,
+        "features": FEATURE_COLUMNS,
+        "n_estimators": getattr(model, "n_estimators", None),
+        **(config or DEFAULT_CONFIG),
+        **(metadata or {})
+    }
+    pipeline = CreditPipeline(model, label_encoders, FEATURE_COLUMNS, TARGET_COLUMN, REGISTRY_NAME, metadata)
+    version = publish(REGISTRY_NAME, {"pipeline": pipeline}, metadata=dict(metadata, schema=pipeline.schema))
 
     print(f"✅ Model trained and saved to: {os.path.abspath(MODEL_PATH)}")
     print(f"✅ Label encoders saved to: {os.path.abspath(ENCODER_PATH)}")
+    print(f"✅ Published model version: {version}")
+    return version
+
+def _fit_forest(model, X_train, y_train, n_jobs=TRAINING_N_JOBS, progress=None):
+    # Grows the forest from its current size to model.n_estimators in a few warm-start
+    # stages so progress(done, total) can be reported; the trees are identical to a
+    # single fit. n_jobs is reset afterwards so serving predicts the same way as before.
+    total = model.n_estimators
+    done = len(getattr(model, "estimators_", []))
+    step = max(1, -(-(total - done) // PROGRESS_STAGES))
+    model.set_params(warm_start=True, n_jobs=n_jobs)
+    while done < total:
+        done = min(done + step, total)
+        model.set_params(n_estimators=done)
+        model.fit(X_train, y_train)
+        if progress is not None:
+            progress(done, total)
+    model.set_params(warm_start=False, n_jobs=None)
+    return model
+
+def current_config():
+    # {"family", "params"} of the serving version, DEFAULT_CONFIG when there is none
+    # or it predates recorded configs
+    version = current_version(REGISTRY_NAME)
+    if version is None:
+        return copy.deepcopy(DEFAULT_CONFIG)
+    metadata = load_manifest(REGISTRY_NAME, version).get("metadata", {})
+    if metadata.get("family") not in SEARCH_SPACES or not isinstance(metadata.get("params"), dict):
+        return copy.deepcopy(DEFAULT_CONFIG)
+    return {"family": metadata["family"], "params": metadata["params"]}
+
+def build_model(config):
+    return _estimator(config["family"]).set_params(**config["params"])
+
+def train_model(df: pd.DataFrame, n_jobs=TRAINING_N_JOBS, progress=None, config=None):
+    X_train, y_train, label_encoders, n_rows = _prepare_training_data(df)
+
+    # Train model (same family + parameters as the serving version)
+    config = config or current_config()
+    model = build_model(config)
+    if isinstance(model, RandomForestRegressor):
+        _fit_forest(model, X_train, y_train, n_jobs, progress)
+    else:
+        model.fit(X_train, y_train)
+        if progress is not None:
+            progress(1, 1)
+
+    return _save_model(model, label_encoders, n_rows, config=config)
+
+def _same_encoding(old_encoders, new_encoders):
+    return all(
+        col in old_encoders and col in new_encoders
+        and list(old_encoders[col].classes_) == list(new_encoders[col].classes_)
+        for col in CATEGORICAL_COLUMNS if col in FEATURE_COLUMNS
+    )
+
+def train_model_incremental(df: pd.DataFrame, model, label_encoders,
+                            added_estimators=ADDED_ESTIMATORS, max_estimators=MAX_ESTIMATORS,
+                            n_jobs=TRAINING_N_JOBS, progress=None):
+    # Keeps the existing trees and fits `added_estimators` new ones on the updated data.
+    # Falls back to a full refit when the categorical encoding changed (old trees would
+    # split on stale codes) or the forest would grow past max_estimators.
+    X_train, y_train, new_encoders, n_rows = _prepare_training_data(df)
+
+    config = current_config()
+    if not isinstance(model, RandomForestRegressor):
+        print(f"♻️ {config['family']} cannot add trees — running a full retrain.")
+        return train_model(df, n_jobs, progress, config)
+    if not _same_encoding(label_encoders, new_encoders):
+        print("♻️ Encoding changed — running a full retrain.")
+        return train_model(df, n_jobs, progress, config)
+    if model.n_estimators + added_estimators > max_estimators:
+        print(f"♻️ Forest would exceed {max_estimators} trees — running a full retrain.")
+        return train_model(df, n_jobs, progress, config)
+
+    # Never mutate the model object that is currently being served
+    model = copy.deepcopy(model)
+    model.set_params(n_estimators=model.n_estimators + added_estimators)
+    _fit_forest(model, X_train, y_train, n_jobs, progress)
+
+    print(f"🌲 Added {added_estimators} trees (total {model.n_estimators}).")
+    return _save_model(model, new_encoders, n_rows, config=config)
+
+# --- TUNING ---
+# Successive-halving random search (all cores) over forest size, depth and
+# max_features, optionally with HistGradientBoosting as an alternative family. The
+# best TUNING_FINALISTS configurations of each family are refitted and measured on
+# the held-out split for accuracy, per-row serving latency and pickled size; the
+# winner is the fastest Pareto-optimal model within TUNING_MAE_TOLERANCE of the best MAE.
+
+TUNING_N_CANDIDATES = 48
+TUNING_CV_FOLDS = 5
+TUNING_FINALISTS = 3
+TUNING_MAE_TOLERANCE = 0.02
+LATENCY_REPEATS = 200
+
+SEARCH_SPACES = {
+    "random_forest": {
+        "n_estimators": [25, 50, 100, 200],
+        "max_depth": [None, 8, 12, 16, 24],
+        "max_features": [1.0, 0.5, 0.33, "sqrt"],
+        "min_samples_leaf": [1, 2, 5]
+    },
+    "hist_gradient_boosting": {
+        "max_iter": [100, 200, 400],
+        "max_depth": [None, 4, 6, 8],
+        "learning_rate": [0.03, 0.1, 0.3],
+        "max_leaf_nodes": [15, 31, 63],
+        "l2_regularization": [0.0, 0.1, 1.0]
+    }
+}
+
+def _estimator(family):
+    if family == "hist_gradient_boosting":
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        return HistGradientBoostingRegressor(random_state=42)
+    return RandomForestRegressor(random_state=42)
+
+def _serving_rows(model, X):
+    # Single-row inputs as each model is served: random forests as float arrays for the
+    # compiled engine (see assets.py), anything else as one-row DataFrames
+    rows = [X.iloc[[i]] for i in range(min(len(X), LATENCY_REPEATS))]
+    if isinstance(model, RandomForestRegressor):
+        from forest_engine import compile_forest
+        return compile_forest(model).predict, [row.to_numpy() for row in rows]
+    return model.predict, rows
+
+def _row_latency_ms(model, X):
+    import time
+    import numpy as np
+
+    predict, rows = _serving_rows(model, X)
+    predict(rows[0])
+    timings = []
+    for i in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        predict(rows[i % len(rows)])
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+def _search_family(family, X_train, y_train, n_candidates, n_jobs):
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV
+
+    search = HalvingRandomSearchCV(
+        _estimator(family), SEARCH_SPACES[family], n_candidates=n_candidates, factor=3,
+        cv=TUNING_CV_FOLDS, scoring="neg_mean_absolute_error", random_state=42, n_jobs=n_jobs
+    )
+    search.fit(X_train, y_train)
+    results = pd.DataFrame(search.cv_results_)
+    # Only candidates that survived to the last (largest) round are comparable
+    results = results[results["iter"] == results["iter"].max()]
+    results = results.sort_values("mean_test_score", ascending=False)
+    return [params for params in results["params"].head(TUNING_FINALISTS)]
+
+def _pareto_front(candidates, keys=("mae", "latency_ms", "size_kb")):
+    return [
+        c for c in candidates
+        if not any(
+            all(o[k] <= c[k] for k in keys) and any(o[k] < c[k] for k in keys)
+            for o in candidates
+        )
+    ]
+
+def tune_model(df: pd.DataFrame, families=("random_forest",), n_candidates=TUNING_N_CANDIDATES,
+               n_jobs=TRAINING_N_JOBS, save=True):
+    import pickle
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    X, y, label_encoders, n_rows = _encode_training_data(df)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    candidates = []
+    for family in families:
+        print(f"🔎 Searching {family} ({n_candidates} candidates, {TUNING_CV_FOLDS}-fold successive halving)")
+        for params in _search_family(family, X_train, y_train, n_candidates, n_jobs):
+            model = _estimator(family).set_params(**params)
+            if isinstance(model, RandomForestRegressor):
+                _fit_forest(model, X_train, y_train, n_jobs)
+            else:
+                model.fit(X_train, y_train)
+            y_pred = model.predict(X_test)
+            candidates.append({
+                "family": family,
+                "params": params,
+                "model": model,
+                "mae": float(mean_absolute_error(y_test, y_pred)),
+                "r2": float(r2_score(y_test, y_pred)),
+                "latency_ms": _row_latency_ms(model, X_test),
+                "size_kb": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1024
+            })
+
+    front = _pareto_front(candidates)
+    best_mae = min(c["mae"] for c in candidates)
+    eligible = [c for c in front if c["mae"] <= best_mae * (1 + TUNING_MAE_TOLERANCE)]
+    winner = min(eligible, key=lambda c: (c["latency_ms"], c["size_kb"]))
+
+    print(f"{'':2} {'family':<24} {'MAE':>8} {'R2':>7} {'ms/row':>8} {'size KB':>9}  params")
+    for c in sorted(candidates, key=lambda c: c["mae"]):
+        mark = "🏆" if c is winner else ("⭐" if c in front else "  ")
+        print(f"{mark} {c['family']:<24} {c['mae']:>8.3f} {c['r2']:>7.4f} {c['latency_ms']:>8.3f} "
+              f"{c['size_kb']:>9.0f}  {c['params']}")
+
+    if save:
+        # family + params are what later retrains rebuild (see current_config)
+        config = {"family": winner["family"],
+                  "params": {k: v.item() if hasattr(v, "item") else v for k, v in winner["params"].items()}}
+        winner["version"] = _save_model(winner["model"], label_encoders, n_rows, config=config, metadata={
+            "holdout_mae": winner["mae"],
+            "holdout_r2": winner["r2"],
+            "latency_ms": winner["latency_ms"],
+            "size_kb": winner["size_kb"]
+        })
+    return winner, candidates
 
 # Run directly
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train or tune the credit score model")
+    subcommands = parser.add_subparsers(dest="command")
+    subcommands.add_parser("train", help="refit the serving model family + parameters (the default command)")
+    tune_parser = subcommands.add_parser("tune", help="search model settings and save the Pareto-best model")
+    tune_parser.add_argument("--hgb", action="store_true", help="also search HistGradientBoostingRegressor")
+    tune_parser.add_argument("--candidates", type=int, default=TUNING_N_CANDIDATES)
+    tune_parser.add_argument("--dry-run", action="store_true", help="report only, do not save the winner")
+    args = parser.parse_args()
+
     try:
-        df = pd.read_csv(DATA_PATH)
-        train_model(df)
+        # Only the columns training needs (feature store when imported, else the CSV)
+        df = load_frame(columns=FEATURE_COLUMNS + [TARGET_COLUMN], data_path=DATA_PATH)
+        if args.command == "tune":
+            families = ("random_forest", "hist_gradient_boosting") if args.hgb else ("random_forest",)
+            tune_model(df, families, args.candidates, save=not args.dry_run)
+        else:
+            train_model(df)
     except Exception as e:
         print(f"❌ Error during training: {e}")
@@ -1,13 +1,14 @@
 import pandas as pd
-import joblib
 import os
-from trainmodel import train_model
-from sklearn.exceptions import NotFittedError
+import assets
+from ingestion import get_ingestion_queue
+import feature_store
 
 # Constants
 DATA_PATH = "credit_score_database.csv"
 MODEL_PATH = "credit_model.pkl"
 ENCODER_PATH = "label_encoders.pkl"
+REGISTRY_NAME = "credit_model"
 
 # Features used in model
 FEATURE_COLUMNS = [
@@ -20,50 +21,43 @@ FEATURE_COLUMNS = [
 # --- Retraining Function ---
 
 def retrain_model_with_input(input_data: dict):
-    # Load existing data
-    if not os.path.exists(DATA_PATH):
+    # Scores the new applicant, then hands the row to the ingestion queue, which
+    # appends it to the database and retrains in the background per its policy.
+    if not os.path.exists(DATA_PATH) and not feature_store.exists():
         raise FileNotFoundError(f"Database not found at: {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH)
 
-    # Load model and encoders
+    # The current version's pipeline, shared with main.py / explanation.py
     try:
-        model = joblib.load(MODEL_PATH)
-        label_encoders = joblib.load(ENCODER_PATH)
-    except (FileNotFoundError, NotFittedError):
+        pipeline = assets.credit_model().get().derived["pipeline"]
+        label_encoders = pipeline.label_encoders
+    except FileNotFoundError:
         raise RuntimeError("Model or encoders not found. Please train the model first.")
 
-    # Convert input to DataFrame
-    input_df = pd.DataFrame([input_data])
-
-    # Handle categorical columns
-    for col, le in label_encoders.items():
-        if col in input_df.columns:
-            input_df[col] = input_df[col].astype(str)
-            known_classes = set(le.classes_)
-            input_df[col] = input_df[col].apply(lambda x: x if x in known_classes else le.classes_[0])
-            input_df[col] = le.transform(input_df[col])
-        else:
-            input_df[col] = 0  # default if missing
-
-    # Reorder & fill missing features
-    for col in FEATURE_COLUMNS:
-        if col not in input_df.columns:
-            input_df[col] = df[col].mode()[0] if col in df.columns else 0
-
-    input_df = input_df[FEATURE_COLUMNS].astype(float)
+    # Fill missing features: encoded columns default to code 0, others to the column mode
+    row = dict(input_data)
+    missing = [col for col in FEATURE_COLUMNS if col not in row]
+    if missing:
+        known = [col for col in missing if col not in label_encoders]
+        df = feature_store.load_frame(columns=known, data_path=DATA_PATH) if known else pd.DataFrame()
+        for col in missing:
+            if col in label_encoders:
+                row[col] = None
+            else:
+                row[col] = df[col].mode()[0] if col in df.columns else 0
 
     # Predict credit score
-    predicted_score = model.predict(input_df)[0]
+    predicted_score = pipeline.score(row, stringify=True)[0]
     print(f"📊 Predicted score added to new data: {predicted_score:.2f}")
 
     # Add score to original input
     input_data['credit_score'] = round(predicted_score, 2)
 
-    # Append to database
-    new_row = pd.DataFrame([input_data])
-    updated_df = pd.concat([df, new_row], ignore_index=True)
-    updated_df.to_csv(DATA_PATH, index=False)
-    print("📁 New data added to credit_score_database.csv")
+    # Track what is fed back into training (can trigger a drift retrain)
+    monitor = assets.drift_monitor()
+    if monitor is not None:
+        monitor.observe(input_data)
 
-    # Retrain model on updated data
-    train_model(updated_df)
+    # Queue for append + deferred retraining; returns immediately
+    get_ingestion_queue().submit(input_data)
+    print("📥 New data queued for ingestion")
+    return input_data['credit_score']